@@ -0,0 +1,53 @@
+import asyncio
+import logging
+import time
+from channels_redis.core import RedisChannelLayer
+
+logger = logging.getLogger(__name__)
+
+# group_send와 같은 방식으로 저장하되, 오래된 메시지 정리까지 스크립트 안에서 처리
+# KEYS = 채널 키 / ARGV = 메시지들, 용량들, 현재 시각, 만료 시간
+SEND_MANY_LUA = """
+local over_capacity = 0
+local current_time = tonumber(ARGV[#ARGV - 1])
+local expiry = tonumber(ARGV[#ARGV])
+for i = 1, #KEYS do
+    redis.call('ZREMRANGEBYSCORE', KEYS[i], 0, current_time - expiry)
+    if redis.call('ZCOUNT', KEYS[i], '-inf', '+inf') < tonumber(ARGV[i + #KEYS]) then
+        redis.call('ZADD', KEYS[i], current_time, ARGV[i])
+        redis.call('EXPIRE', KEYS[i], expiry)
+    else
+        over_capacity = over_capacity + 1
+    end
+end
+return over_capacity
+"""
+
+
+# 여러 채널에 같은 메시지를 보내는 send_many 확장
+# 같은 Daphne 프로세스의 채널들은 하나의 Redis 키를 공유하므로, 수신자 수와 관계없이 shard마다 스크립트 한 번으로 전송
+class BatchRedisChannelLayer(RedisChannelLayer):
+    extensions = RedisChannelLayer.extensions + ["send_many"]
+
+    async def send_many(self, channel_names, message):
+        assert isinstance(message, dict), "message is not a dict"
+        if not channel_names:
+            return
+        (
+            connection_to_channel_keys,
+            channel_keys_to_message,
+            channel_keys_to_capacity,
+        ) = self._map_channel_keys_to_connection(channel_names, message)
+
+        async def send_to_connection(index, channel_keys):
+            args = [channel_keys_to_message[key] for key in channel_keys]
+            args += [channel_keys_to_capacity[key] for key in channel_keys]
+            args += [time.time(), int(self.expiry)]
+            return await self.connection(index).eval(SEND_MANY_LUA, len(channel_keys), *channel_keys, *args)
+
+        over_capacity = sum(await asyncio.gather(*(
+            send_to_connection(index, channel_keys)
+            for index, channel_keys in connection_to_channel_keys.items()
+        )))
+        if over_capacity > 0:
+            logger.info("%s of %s channels over capacity", over_capacity, len(channel_names))
@@ -14,9 +14,12 @@ class ErrorType(Enum):
     USER_ID_NOT_FOUND = (status.HTTP_400_BAD_REQUEST, "The user_id parameter is missing in the request URL.")
     INVALID_EMAIL_REQUEST = (status.HTTP_400_BAD_REQUEST, "The email sending request is invalid.")
     PERMISSION_DENIED = (status.HTTP_403_FORBIDDEN, "You do not have permission to update win-loss.")
+    INVALID_AVATAR_IMAGE = (status.HTTP_400_BAD_REQUEST, "The avatar must be a valid image file.")
 
     # common
     FIELD_REQUIRED = (status.HTTP_400_BAD_REQUEST, "some fields are missing.")
+    INVALID_CURSOR = (status.HTTP_400_BAD_REQUEST, "Invalid pagination cursor.")
+    INVALID_INTERNAL_TOKEN = (status.HTTP_401_UNAUTHORIZED, "Invalid internal service token.")
 
     # friend
     FRIEND_REQUEST_ALREADY_EXISTS = (status.HTTP_409_CONFLICT, "Friend request already exists or received.")
@@ -30,6 +33,7 @@ class ErrorType(Enum):
     FRIEND_REQUEST_BLOCKED = (status.HTTP_403_FORBIDDEN, "Friend request blocked due to existing block relationship.")
     BLOCK_ALREADY_EXISTS = (status.HTTP_409_CONFLICT, "Block relationship already exists.")
     BLOCK_NOT_FOUND = (status.HTTP_404_NOT_FOUND, "Block relationship not found.")
+    BLOCK_CACHE_UNAVAILABLE = (status.HTTP_503_SERVICE_UNAVAILABLE, "Block cache is unavailable.")
     
     def __init__(self, status, message):
         self.status = status
@@ -0,0 +1,48 @@
+import json
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 채널 레이어 전송에만 쓰이는 키 (클라이언트로 보내지 않음)
+# "type"은 consumer 핸들러 선택에 쓰이지만 클라이언트도 알림 종류 구분에 사용하므로 유지
+ENCODED_KEY = "encoded"
+TRANSPORT_KEYS = frozenset({ENCODED_KEY, "__asgi_channel__"})
+
+
+def _json_dumps(obj):
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+def _orjson_dumps(obj):
+    return orjson.dumps(obj).decode('utf-8')
+
+# NOTIFICATION_JSON_ENCODER: auto(orjson이 설치되어 있으면 사용) / orjson / json
+def get_encoder(name):
+    if name == 'json' or (name == 'auto' and orjson is None):
+        return _json_dumps
+    if name not in ('auto', 'orjson'):
+        raise ImproperlyConfigured(f"Unknown NOTIFICATION_JSON_ENCODER: {name}")
+    if orjson is None:
+        raise ImproperlyConfigured("NOTIFICATION_JSON_ENCODER is 'orjson' but orjson is not installed.")
+    return _orjson_dumps
+
+
+dumps = get_encoder(settings.NOTIFICATION_JSON_ENCODER)
+
+
+def client_payload(event):
+    return {key: value for key, value in event.items() if key not in TRANSPORT_KEYS}
+
+# 미리 인코딩된 텍스트가 있으면 그대로 사용
+def encode_event(event):
+    encoded = event.get(ENCODED_KEY)
+    if encoded is None:
+        encoded = dumps(client_payload(event))
+    return encoded
+
+# 여러 연결로 보내는 이벤트는 한 번만 인코딩해서 함께 전송
+def with_encoded(event):
+    return {**event, ENCODED_KEY: dumps(client_payload(event))}
@@ -1,24 +1,93 @@
-import jwt
+import re
 import json
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 from channels.middleware import BaseMiddleware
 from django.http import JsonResponse
 from urllib.parse import parse_qs
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.state import token_backend
+from rest_framework_simplejwt.tokens import AccessToken
+
+# 인증 제외 경로 prefix들을 하나의 정규식으로 컴파일
+def compile_path_matcher(prefixes):
+    if not prefixes:
+        return lambda path: None
+    # 긴 prefix를 먼저 시도하도록 정렬
+    pattern = '|'.join(re.escape(prefix) for prefix in sorted(set(prefixes), key=len, reverse=True))
+    return re.compile(pattern).match
+
+
+is_excluded_path = compile_path_matcher(settings.AUTH_EXCLUDED_PATHS)
+
+# 검증된 JWT claims를 토큰 digest 기준으로 보관하는 LRU 캐시
+# 같은 세션의 반복 요청에서 서명 검증을 생략하되, exp가 지난 토큰은 제공하지 않음
+class TokenClaimsCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, digest):
+        with self._lock:
+            payload = self._entries.get(digest)
+            if payload is None:
+                return None
+            if payload["exp"] <= time.time():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return payload
+
+    def set(self, digest, payload):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[digest] = payload
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_claims_cache = TokenClaimsCache(settings.JWT_CLAIMS_CACHE_SIZE)
+
+
+# SimpleJWT 서명 키로 토큰을 검증하고 claims 반환 (실패 시 TokenBackendError)
+# 수명이 긴 refresh 토큰 등은 거부하고 access 토큰만 허용
+def decode_token(token):
+    digest = hashlib.sha256(token.encode('utf-8')).digest()
+    payload = token_claims_cache.get(digest)
+    if payload is not None:
+        return payload
+
+    payload = token_backend.decode(token)
+    if payload.get(api_settings.TOKEN_TYPE_CLAIM) != AccessToken.token_type:
+        raise TokenBackendError("Token has wrong type")
+    if "exp" in payload:
+        token_claims_cache.set(digest, payload)
+    return payload
+
+
+# 내부 서비스 호출 확인 (JWT 대신 X-Internal-Token 공유 토큰 사용)
+def has_internal_token(request):
+    token = request.headers.get('X-Internal-Token', '')
+    return bool(settings.INTERNAL_API_TOKEN) and hmac.compare_digest(token, settings.INTERNAL_API_TOKEN)
 
-EXCLUDED_PATHS = [
-            '/api/user/register/email-check/',
-            '/api/user/register/nickname-check/',
-            '/api/user/register/complete/',
-            '/api/user/login/',
-            '/api/user/2fa/',
-            '/media/avatars/',
-            '/api/schema/',
-]
 
 # HTTP Middleware
 class CustomHttpMiddleware(MiddlewareMixin):
     def process_request(self, request):
-        if any(request.path.startswith(path) for path in EXCLUDED_PATHS):  # 제외된 경로 처리
+        if is_excluded_path(request.path):  # 제외된 경로 처리
             return
 
         token_line = request.headers.get("Authorization")
@@ -29,7 +98,7 @@ class CustomHttpMiddleware(MiddlewareMixin):
             # JWT 디코딩 및 user_id 추출
             token = token_line.split(" ")[1]
             request.token = token
-            payload = jwt.decode(token, options={"verify_signature": False})
+            payload = decode_token(token)
             request.user_id = payload.get("user_id")
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=401)
@@ -43,7 +112,7 @@ class CustomWsMiddleware(BaseMiddleware):
             return await self.reject_request(send, "Authentication token missing.")
 
         try:
-            payload = jwt.decode(token, options={"verify_signature": False})
+            payload = decode_token(token)
             user_id = payload.get('user_id')
             scope['user_id'] = user_id
         except Exception as e:
@@ -0,0 +1,41 @@
+import base64
+import binascii
+import json
+from django.conf import settings
+from .custom_validation_error import CustomValidationError
+from .error_type import ErrorType
+
+# 키셋(커서) 페이지네이션
+# 커서는 마지막으로 반환된 행의 정렬 키를 담은 불투명한 토큰
+
+def encode_cursor(position):
+    raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise CustomValidationError(ErrorType.INVALID_CURSOR)
+
+def get_page_size(value):
+    if value in (None, ''):
+        return settings.DEFAULT_PAGE_SIZE
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        raise CustomValidationError(ErrorType.VALIDATION_ERROR)
+    if page_size < 1:
+        raise CustomValidationError(ErrorType.VALIDATION_ERROR)
+    return min(page_size, settings.MAX_PAGE_SIZE)
+
+# page_size + 1개를 조회한 결과에서 다음 페이지 커서를 계산
+def paginate(rows, page_size, get_position):
+    rows = list(rows)
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(get_position(rows[-1]))
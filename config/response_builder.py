@@ -1,5 +1,6 @@
 from rest_framework.response import Response
 from rest_framework import status
+from django.http import JsonResponse
 from .custom_validation_error import CustomValidationError
 
 def response_ok(message="ok", status=status.HTTP_200_OK):
@@ -25,6 +26,23 @@ def response_error(custom_validation_error:CustomValidationError):
         status=error_type.status
     )
 
+# async 뷰용 응답 (DRF Response 대신 JsonResponse 사용)
+def json_response_ok(message="ok", status=status.HTTP_200_OK):
+    if not isinstance(message, dict):
+        message = {"message": message}
+    return JsonResponse(message, status=status)
+
+def json_response_errors(errors):
+    if isinstance(errors, CustomValidationError):
+        return JsonResponse(errors.errors, status=errors.error_type.status)
+
+    if not errors:
+        errors = "unknown error."
+    return JsonResponse(
+        {"message": errors},
+        status=extract_status(errors)
+    )
+
 def extract_status(errors):
     if isinstance(errors, dict):
         for key, value in errors.items():
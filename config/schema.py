@@ -0,0 +1,17 @@
+from django.urls import reverse
+
+# drf-spectacular는 APIView만 수집하므로 async View(django.views.View)의 문서는 직접 등록
+# 등록된 operation은 add_async_view_operations 후처리 훅에서 스키마에 추가됨
+_async_view_operations = []
+
+def document_async_view(url_name, method, operation):
+    def decorator(view_class):
+        _async_view_operations.append((url_name, method, operation))
+        return view_class
+    return decorator
+
+
+def add_async_view_operations(result, generator, request, public):
+    for url_name, method, operation in _async_view_operations:
+        result['paths'].setdefault(reverse(url_name), {})[method] = operation
+    return result
@@ -1,31 +1,90 @@
+import asyncio
 import aiohttp
-from config.settings import CHAT_SERVICE_URL
+from django.conf import settings
 from datetime import datetime
 
+# 이벤트 루프별로 재사용하는 채팅 서비스 HTTP 세션 (keep-alive 커넥션 풀)
+_chat_sessions = {}
+# 닫힌 루프의 세션을 정리하는 태스크 (완료 전에 GC되지 않도록 참조 유지)
+_cleanup_tasks = set()
+
+def get_chat_session():
+    loop = asyncio.get_running_loop()
+
+    # 이미 닫힌 루프의 세션은 현재 루프에서 닫아 커넥터 정리
+    stale_sessions = pop_stale_sessions()
+    if stale_sessions:
+        task = loop.create_task(close_sessions(stale_sessions))
+        _cleanup_tasks.add(task)
+        task.add_done_callback(_cleanup_tasks.discard)
+
+    session = _chat_sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=settings.CHAT_SERVICE_POOL_SIZE,
+            limit_per_host=settings.CHAT_SERVICE_POOL_SIZE_PER_HOST,
+            keepalive_timeout=settings.CHAT_SERVICE_KEEPALIVE_TIMEOUT,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=settings.CHAT_SERVICE_TIMEOUT,
+            connect=settings.CHAT_SERVICE_CONNECT_TIMEOUT,
+        )
+        session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        _chat_sessions[loop] = session
+    return session
+
+
+def pop_stale_sessions():
+    stale_loops = [session_loop for session_loop in _chat_sessions if session_loop.is_closed()]
+    return [_chat_sessions.pop(stale_loop) for stale_loop in stale_loops]
+
+
+# 커넥터 정리는 루프에 묶여 있지 않아 다른 루프의 세션도 닫을 수 있음
+async def close_sessions(sessions):
+    for session in sessions:
+        if not session.closed:
+            await session.close()
+
+
+# 현재 루프와 닫힌 루프의 세션 종료 (세션을 쓰는 워커 커맨드가 끝날 때 호출)
+# daphne는 ASGI lifespan을 지원하지 않으므로 서버 프로세스에서는 종료 시 호출되지 않음
+async def close_chat_session():
+    sessions = pop_stale_sessions()
+    session = _chat_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        sessions.append(session)
+    await close_sessions(sessions)
+
+
+def chat_service_headers(token, idempotency_key=None):
+    headers = {'Authorization': f'Bearer {token}'}
+    if idempotency_key:
+        headers['Idempotency-Key'] = idempotency_key
+    return headers
+
+
 # 채팅 서비스의 채팅방 생성 API 호출
-async def get_chatroom(user1_id, user2_id, token):
-    request_url = f'{CHAT_SERVICE_URL}create/'
-    headers  = {'Authorization': f'Bearer {token}'}
+async def get_chatroom(user1_id, user2_id, token, idempotency_key=None):
+    request_url = f'{settings.CHAT_SERVICE_URL}create/'
+    headers  = chat_service_headers(token, idempotency_key)
     payload = {"user1_id": user1_id, "user2_id": user2_id}
     
-    async with aiohttp.ClientSession() as session:
-        async with session.post(request_url, json=payload, headers=headers, timeout=10) as response:
-            if response.status == 201: # 채팅방 생성 성공
-                return await response.json()
-            return None
+    async with get_chat_session().post(request_url, json=payload, headers=headers) as response:
+        if response.status == 201: # 채팅방 생성 성공
+            return await response.json()
+        return None
 
 
 # 채팅 서비스의 채팅방 삭제 API 호출
-async def delete_chatroom(chatroom_id, token):
-    request_url = f'{CHAT_SERVICE_URL}delete/'
-    headers = {'Authorization': f'Bearer {token}'}
+async def delete_chatroom(chatroom_id, token, idempotency_key=None):
+    request_url = f'{settings.CHAT_SERVICE_URL}delete/'
+    headers = chat_service_headers(token, idempotency_key)
     payload = {"chatroom_id": chatroom_id}
     
-    async with aiohttp.ClientSession() as session:
-        async with session.post(request_url, json=payload, headers=headers, timeout=10) as response:
-            if response.status == 204: # 채팅방 삭제 성공
-                return True
-            return None
+    async with get_chat_session().post(request_url, json=payload, headers=headers) as response:
+        if response.status == 204: # 채팅방 삭제 성공
+            return True
+        return None
         
 def format_datetime(dt):
     if isinstance(dt, datetime):
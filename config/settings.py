@@ -1,6 +1,6 @@
 from pathlib import Path
 import os
-from decouple import config # ENV
+from decouple import config, Csv # ENV
 
 # ENV
 SECRET_KEY = config("SECRET_KEY")
@@ -13,6 +13,27 @@ EMAIL_HOST_USER = config("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD")
 
 CHAT_SERVICE_URL = config("CHAT_SERVICE_URL")
+CHAT_SERVICE_TIMEOUT = config("CHAT_SERVICE_TIMEOUT", default=10, cast=float)
+CHAT_SERVICE_CONNECT_TIMEOUT = config("CHAT_SERVICE_CONNECT_TIMEOUT", default=3, cast=float)
+CHAT_SERVICE_POOL_SIZE = config("CHAT_SERVICE_POOL_SIZE", default=100, cast=int)
+CHAT_SERVICE_POOL_SIZE_PER_HOST = config("CHAT_SERVICE_POOL_SIZE_PER_HOST", default=20, cast=int)
+CHAT_SERVICE_KEEPALIVE_TIMEOUT = config("CHAT_SERVICE_KEEPALIVE_TIMEOUT", default=30, cast=float)
+
+# 메일 발송 큐 워커 설정
+EMAIL_QUEUE_BATCH_SIZE = config("EMAIL_QUEUE_BATCH_SIZE", default=50, cast=int)
+EMAIL_QUEUE_POLL_INTERVAL = config("EMAIL_QUEUE_POLL_INTERVAL", default=1, cast=float)
+EMAIL_QUEUE_LEASE_SECONDS = config("EMAIL_QUEUE_LEASE_SECONDS", default=120, cast=int)
+EMAIL_QUEUE_RETRY_DELAY = config("EMAIL_QUEUE_RETRY_DELAY", default=10, cast=int)
+EMAIL_QUEUE_MAX_RETRY_DELAY = config("EMAIL_QUEUE_MAX_RETRY_DELAY", default=1800, cast=int)
+EMAIL_QUEUE_MAX_ATTEMPTS = config("EMAIL_QUEUE_MAX_ATTEMPTS", default=8, cast=int)
+
+# 채팅 서비스 outbox 워커 설정
+CHAT_OUTBOX_BATCH_SIZE = config("CHAT_OUTBOX_BATCH_SIZE", default=50, cast=int)
+CHAT_OUTBOX_POLL_INTERVAL = config("CHAT_OUTBOX_POLL_INTERVAL", default=1, cast=float)
+CHAT_OUTBOX_LEASE_SECONDS = config("CHAT_OUTBOX_LEASE_SECONDS", default=60, cast=int)
+CHAT_OUTBOX_RETRY_DELAY = config("CHAT_OUTBOX_RETRY_DELAY", default=10, cast=int)
+CHAT_OUTBOX_MAX_RETRY_DELAY = config("CHAT_OUTBOX_MAX_RETRY_DELAY", default=3600, cast=int)
+CHAT_OUTBOX_MAX_ATTEMPTS = config("CHAT_OUTBOX_MAX_ATTEMPTS", default=10, cast=int)
 
 DATABASE_ENGINE = config('DATABASE_ENGINE', default='sqlite3')
 
@@ -21,6 +42,58 @@ REDIS_PORT = config('REDIS_PORT', cast=int)
 REDIS_DB = config('REDIS_DB', cast=int)
 REDIS_CAPACITY = config('REDIS_CAPACITY', cast=int)
 
+# 접속 상태 만료 시간(초), 클라이언트는 이보다 짧은 주기로 heartbeat 전송
+PRESENCE_TTL = config('PRESENCE_TTL', default=60, cast=int)
+# 접속/종료가 반복될 때 이 시간(초) 동안 모아서 최종 상태만 친구들에게 알림
+PRESENCE_DEBOUNCE_SECONDS = config('PRESENCE_DEBOUNCE_SECONDS', default=2, cast=float)
+PRESENCE_STATE_TIMEOUT = config('PRESENCE_STATE_TIMEOUT', default=86400, cast=int)
+PRESENCE_REAPER_BATCH_SIZE = config('PRESENCE_REAPER_BATCH_SIZE', default=500, cast=int)
+PRESENCE_REAPER_INTERVAL = config('PRESENCE_REAPER_INTERVAL', default=30, cast=float)
+
+DEFAULT_PAGE_SIZE = config('DEFAULT_PAGE_SIZE', default=50, cast=int)
+MAX_PAGE_SIZE = config('MAX_PAGE_SIZE', default=200, cast=int)
+
+BULK_BLOCK_MAX_USERS = config('BULK_BLOCK_MAX_USERS', default=500, cast=int)
+BLOCK_CHECK_MAX_PAIRS = config('BLOCK_CHECK_MAX_PAIRS', default=1000, cast=int)
+
+# 내부 서비스(채팅, 매치메이킹) 호출용 공유 토큰 (X-Internal-Token 헤더)
+INTERNAL_API_TOKEN = config('INTERNAL_API_TOKEN', default='')
+NOTIFICATION_FAN_OUT_MAX_USERS = config('NOTIFICATION_FAN_OUT_MAX_USERS', default=1000, cast=int)
+# 알림 JSON 인코더: auto(orjson이 설치되어 있으면 사용) / orjson / json
+NOTIFICATION_JSON_ENCODER = config('NOTIFICATION_JSON_ENCODER', default='auto')
+
+# 이메일 인증 코드 저장소: redis(TTL로 만료) / database(EmailVerificationCode 테이블)
+VERIFICATION_CODE_BACKEND = config('VERIFICATION_CODE_BACKEND', default='redis')
+VERIFICATION_CODE_TTL = config('VERIFICATION_CODE_TTL', default=300, cast=int)
+
+# 동시에 비밀번호를 해시하는 최대 스레드 수 (기본: CPU 코어 수)
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', default=os.cpu_count() or 1, cast=int)
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=870000, cast=int)
+
+# 아바타 업로드: 프로필용/친구 목록용 크기(px)로 줄여 WebP로 다시 인코딩
+AVATAR_SIZE = config('AVATAR_SIZE', default=256, cast=int)
+AVATAR_THUMBNAIL_SIZE = config('AVATAR_THUMBNAIL_SIZE', default=64, cast=int)
+AVATAR_WEBP_QUALITY = config('AVATAR_WEBP_QUALITY', default=80, cast=int)
+# 디코딩 전에 거부하는 최대 픽셀 수 (압축률이 높은 작은 파일로 메모리를 과도하게 쓰지 않도록)
+AVATAR_MAX_PIXELS = config('AVATAR_MAX_PIXELS', default=4096 * 4096, cast=int)
+
+PROFILE_CACHE_TIMEOUT = config('PROFILE_CACHE_TIMEOUT', default=3600, cast=int)
+
+JWT_CLAIMS_CACHE_SIZE = config('JWT_CLAIMS_CACHE_SIZE', default=4096, cast=int)
+
+# 인증 없이 접근 가능한 경로 prefix (AUTH_EXTRA_EXCLUDED_PATHS로 추가 가능)
+AUTH_EXCLUDED_PATHS = [
+    '/api/user/register/email-check/',
+    '/api/user/register/nickname-check/',
+    '/api/user/register/complete/',
+    '/api/user/login/',
+    '/api/user/2fa/',
+    '/media/avatars/',
+    '/api/schema/',
+    '/api/user/friend/internal/',
+    '/api/user/internal/',
+] + config('AUTH_EXTRA_EXCLUDED_PATHS', default='', cast=Csv())
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 MEDIA_URL = '/media/'
@@ -103,6 +176,17 @@ elif DATABASE_ENGINE == 'postgresql':
 else:
     raise ValueError("Unsupported DATABASE_ENGINE value")
 
+# 첫 번째 hasher로 새 비밀번호를 해시하고, 나머지는 기존 해시 검증용 (로그인 시 첫 번째 hasher로 재해시)
+# PASSWORD_HASHER=argon2 로 Argon2를 기본 hasher로 사용 (argon2-cffi)
+PASSWORD_HASHERS = [
+    'user_management.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+if config('PASSWORD_HASHER', default='pbkdf2') == 'argon2':
+    PASSWORD_HASHERS.insert(0, PASSWORD_HASHERS.pop(1))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -122,6 +206,13 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+SPECTACULAR_SETTINGS = {
+    'POSTPROCESSING_HOOKS': [
+        'drf_spectacular.hooks.postprocess_schema_enums',
+        'config.schema.add_async_view_operations',
+    ],
+}
+
 # Internationalization
 
 LANGUAGE_CODE = 'en-us'
@@ -143,7 +234,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # email 설정
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# 로컬/테스트: django.core.mail.backends.locmem.EmailBackend 또는 filebased.EmailBackend (EMAIL_FILE_PATH)
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default='/tmp/app-messages')
 EMAIL_HOST = EMAIL_HOST
 EMAIL_PORT = EMAIL_PORT
 EMAIL_USE_TLS = EMAIL_USE_TLS
@@ -161,10 +254,18 @@ ASGI_APPLICATION = 'config.asgi.application'
 # Channels Layers 설정 (Redis 백엔드 사용)
 CHANNEL_LAYERS = {
     'default': {
-        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'BACKEND': 'config.channel_layers.BatchRedisChannelLayer',
         'CONFIG': {
             "hosts": [(REDIS_HOST, REDIS_PORT)],
             "capacity": REDIS_CAPACITY, # 메시지 큐 용량
         },
     },
-}
\ No newline at end of file
+}
+
+# Cache 설정 (Redis 백엔드 사용)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f'redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}',
+    },
+}
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import time
+from datetime import timedelta
+from unittest.mock import patch, AsyncMock, MagicMock
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from user_management.models import User
+from .middleware import CustomHttpMiddleware, token_claims_cache, compile_path_matcher
+from .services import get_chatroom, delete_chatroom, close_chat_session, get_chat_session
+from .channel_layers import BatchRedisChannelLayer
+from .json_encoding import encode_event, with_encoded, get_encoder, orjson
+
+
+class CustomHttpMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        token_claims_cache.clear()
+        self.factory = RequestFactory()
+        self.middleware = CustomHttpMiddleware(lambda request: HttpResponse())
+
+    def process(self, token):
+        request = self.factory.get('/api/user/profile/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return request, self.middleware.process_request(request)
+
+    def test_valid_token(self):
+        token = str(AccessToken.for_user(User(id=7)))
+        request, response = self.process(token)
+
+        self.assertIsNone(response)
+        self.assertEqual(request.user_id, 7)
+
+    def test_invalid_signature_rejected(self):
+        token = str(AccessToken.for_user(User(id=7)))
+        header, payload, signature = token.split('.')
+        tampered = f"{header}.{payload}.{signature[::-1]}"
+        _, response = self.process(tampered)
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_expired_token_rejected(self):
+        access_token = AccessToken.for_user(User(id=7))
+        access_token.set_exp(lifetime=-timedelta(seconds=1))
+        _, response = self.process(str(access_token))
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_token_rejected(self):
+        token = str(RefreshToken.for_user(User(id=7)))
+        _, response = self.process(token)
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_cached_claims_skip_verification(self):
+        token = str(AccessToken.for_user(User(id=7)))
+        self.process(token)
+
+        with patch('config.middleware.token_backend.decode') as mock_decode:
+            request, response = self.process(token)
+        mock_decode.assert_not_called()
+        self.assertEqual(request.user_id, 7)
+
+    def test_cache_honors_exp(self):
+        # exp가 지난 claims는 캐시에서 제공하지 않음
+        token_claims_cache.set(b'expired', {"user_id": 7, "exp": time.time() - 1})
+        token_claims_cache.set(b'valid', {"user_id": 7, "exp": time.time() + 60})
+
+        self.assertIsNone(token_claims_cache.get(b'expired'))
+        self.assertEqual(token_claims_cache.get(b'valid')["user_id"], 7)
+
+
+class ExcludedPathMatcherTest(SimpleTestCase):
+    def test_prefix_match(self):
+        is_excluded = compile_path_matcher(['/api/user/login/', '/health/'])
+
+        self.assertTrue(is_excluded('/api/user/login/'))
+        self.assertTrue(is_excluded('/health/live'))
+        self.assertFalse(is_excluded('/api/user/profile/'))
+        self.assertFalse(is_excluded('/prefix/health/'))
+
+    def test_special_characters_escaped(self):
+        is_excluded = compile_path_matcher(['/api/v1.0/'])
+
+        self.assertTrue(is_excluded('/api/v1.0/items'))
+        self.assertFalse(is_excluded('/api/v1x0/items'))
+
+    def test_empty_prefixes(self):
+        self.assertFalse(compile_path_matcher([])('/api/user/login/'))
+
+
+class ChatServiceClientTest(SimpleTestCase):
+    async def test_connections_are_reused(self):
+        # 로컬 스텁 채팅 서버: 요청마다 클라이언트 소켓 주소를 기록
+        peers = []
+
+        async def create(request):
+            peers.append(request.transport.get_extra_info('peername'))
+            return web.json_response({"id": 1}, status=201)
+
+        async def delete(request):
+            peers.append(request.transport.get_extra_info('peername'))
+            return web.Response(status=204)
+
+        app = web.Application()
+        app.router.add_post('/create/', create)
+        app.router.add_post('/delete/', delete)
+
+        async with TestServer(app) as server:
+            with override_settings(CHAT_SERVICE_URL=str(server.make_url('/'))):
+                try:
+                    for _ in range(3):
+                        self.assertEqual(await get_chatroom(1, 2, 'token'), {"id": 1})
+                    self.assertTrue(await delete_chatroom(1, 'token'))
+                finally:
+                    await close_chat_session()
+
+        self.assertEqual(len(peers), 4)
+        self.assertEqual(len(set(peers)), 1)
+
+    def test_sessions_of_closed_loops_are_closed(self):
+        async def open_session():
+            return get_chat_session()
+
+        async def replace_session():
+            session = get_chat_session()
+            await asyncio.sleep(0)
+            await close_chat_session()
+            return session
+
+        stale_session = asyncio.run(open_session())
+        new_session = asyncio.run(replace_session())
+
+        self.assertIsNot(new_session, stale_session)
+        self.assertTrue(stale_session.closed)
+
+
+class BatchRedisChannelLayerTest(SimpleTestCase):
+    def test_send_many_uses_one_script_per_shard(self):
+        layer = BatchRedisChannelLayer(hosts=[('localhost', 6379)])
+        connection = MagicMock()
+        connection.eval = AsyncMock(return_value=0)
+        channel_names = [f'specific.worker{i % 2}!{i}' for i in range(64)]
+
+        with patch.object(layer, 'connection', return_value=connection):
+            async_to_sync(layer.send_many)(channel_names, {'type': 'tournament_end'})
+
+        # 같은 프로세스의 채널은 하나의 키로 묶임
+        connection.eval.assert_awaited_once()
+        self.assertEqual(connection.eval.await_args.args[1], 2)
+
+
+class JsonEncodingTest(SimpleTestCase):
+    def test_transport_keys_are_stripped(self):
+        event = {'type': 'tournament_end', 'content': {'round': 1}, '__asgi_channel__': ['specific.a!1']}
+        self.assertEqual(json.loads(encode_event(event)), {'type': 'tournament_end', 'content': {'round': 1}})
+        self.assertEqual(encode_event(with_encoded(event)), encode_event(event))
+
+    def test_encoders_produce_the_same_json(self):
+        payload = {'type': 'friend.request', 'content': {'from_user': '닉네임', 'id': 3}}
+        self.assertEqual(json.loads(get_encoder('json')(payload)), payload)
+        if orjson is not None:
+            self.assertEqual(get_encoder('orjson')(payload), get_encoder('json')(payload))
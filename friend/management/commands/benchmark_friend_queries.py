@@ -0,0 +1,124 @@
+import random
+import statistics
+import time
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from friend.models import Block, FriendRequest, Friendship
+from friend.services import FriendService
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a large relationship graph and report query plans and latencies of the friend queries. "
+        "Run it against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--relationships', type=int, default=1_000_000)
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--samples', type=int, default=200)
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--skip-seed', action='store_true', help="Reuse previously seeded bench users.")
+
+    def handle(self, *args, **options):
+        if not options['skip_seed']:
+            self.seed(options['users'], options['relationships'], options['batch_size'])
+
+        user_ids = list(User.objects.filter(nickname__startswith='bench_').values_list('id', flat=True))
+        if len(user_ids) < 2:
+            self.stderr.write("No bench users found. Run without --skip-seed first.")
+            return
+
+        rng = random.Random(42)
+        page_size = options['page_size']
+        queries = {
+            "friend list page": lambda: FriendService.get_friends_queryset(rng.choice(user_ids), None, page_size),
+            "received requests page": lambda: FriendService.get_received_requests_queryset(rng.choice(user_ids), None, page_size),
+            "friendship pair lookup": lambda: Friendship.objects.between(*rng.sample(user_ids, 2)),
+            "block check": lambda: Block.objects.filter(blocker_id=rng.choice(user_ids), blocked_id=rng.choice(user_ids)),
+        }
+
+        for name, build_query in queries.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(build_query().explain())
+            self.report(options['samples'], lambda: list(build_query()))
+
+        self.stdout.write(self.style.MIGRATE_HEADING("relationship status (send_friend_request)"))
+        nicknames = dict(User.objects.filter(id__in=user_ids[:1000]).values_list('id', 'nickname'))
+        status_args = lambda: (rng.choice(user_ids), nicknames[rng.choice(list(nicknames))])
+        self.report(options['samples'], lambda: async_to_sync(FriendService.get_relationship_status)(*status_args()))
+
+    def report(self, samples, run):
+        latencies = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            run()
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+        self.stdout.write(
+            f"  samples={samples} p50={statistics.median(latencies):.3f}ms "
+            f"p95={p95:.3f}ms max={latencies[-1]:.3f}ms\n"
+        )
+
+    def seed(self, user_count, relationships, batch_size):
+        self.stdout.write(f"seeding {user_count} users and {relationships} relationships on {connection.vendor}...")
+        password = make_password(None)
+        start = time.perf_counter()
+
+        for offset in range(0, user_count, batch_size):
+            User.objects.bulk_create(
+                [
+                    User(email=f"bench_{i}@bench.local", nickname=f"bench_{i}", password=password)
+                    for i in range(offset, min(offset + batch_size, user_count))
+                ],
+                batch_size=batch_size,
+                ignore_conflicts=True,
+            )
+        user_ids = list(User.objects.filter(nickname__startswith='bench_').order_by('id').values_list('id', flat=True))
+        user_count = len(user_ids)
+
+        # 친구 관계 80%, 대기 중인 요청 10%, 차단 10%
+        # i번째 관계는 (a, a + k) 쌍이라 k < user_count / 2 이면 중복 없음
+        def pairs(start_index, count):
+            for i in range(start_index, start_index + count):
+                a = i % user_count
+                k = 1 + i // user_count
+                yield user_ids[a], user_ids[(a + k) % user_count]
+
+        friendship_count = relationships * 8 // 10
+        request_count = relationships // 10
+        block_count = relationships - friendship_count - request_count
+        self.bulk_insert(
+            (Friendship(user1_id=min(a, b), user2_id=max(a, b)) for a, b in pairs(0, friendship_count)),
+            Friendship, batch_size
+        )
+        self.bulk_insert(
+            (FriendRequest(from_user_id=a, to_user_id=b) for a, b in pairs(friendship_count, request_count)),
+            FriendRequest, batch_size
+        )
+        self.bulk_insert(
+            (Block(blocker_id=a, blocked_id=b) for a, b in pairs(friendship_count + request_count, block_count)),
+            Block, batch_size
+        )
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+        self.stdout.write(f"seeded in {time.perf_counter() - start:.1f}s\n")
+
+    def bulk_insert(self, objects, model, batch_size):
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                model.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch, ignore_conflicts=True)
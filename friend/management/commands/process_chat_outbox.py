@@ -0,0 +1,30 @@
+import asyncio
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from config.services import close_chat_session
+from friend.services import ChatRoomOutboxService
+
+
+class Command(BaseCommand):
+    help = "Drain pending chat-room operations from the ChatRoomOutbox table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.CHAT_OUTBOX_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=settings.CHAT_OUTBOX_POLL_INTERVAL)
+        parser.add_argument('--once', action='store_true', help="Process due operations once and exit.")
+
+    def handle(self, *args, **options):
+        asyncio.run(self.drain(options['batch_size'], options['interval'], options['once']))
+
+    async def drain(self, batch_size, interval, once):
+        try:
+            while True:
+                processed = await ChatRoomOutboxService.process_due_operations(batch_size)
+                if processed:
+                    self.stdout.write(f"processed {processed} chat-room operations")
+                if once and processed < batch_size:
+                    return
+                if not processed:
+                    await asyncio.sleep(interval)
+        finally:
+            await close_chat_session()
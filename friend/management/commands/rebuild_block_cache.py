@@ -0,0 +1,18 @@
+import time
+from django.core.management.base import BaseCommand
+from friend.services import BlockCacheService
+
+
+class Command(BaseCommand):
+    help = "Rebuild the Redis block sets (blocks:{user_id}) from the Block table. Run on cold starts or after a Redis outage."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        blockers, blocks, removed = BlockCacheService.rebuild(options['batch_size'])
+        self.stdout.write(
+            f"rebuilt {blockers} block sets ({blocks} blocks), removed {removed} stale sets "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-19 04:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('friend', '0004_chatroomoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatroomoutbox',
+            name='chatroom_id',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatroomoutbox',
+            name='idempotency_key',
+            field=models.CharField(max_length=64, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='chatroomoutbox',
+            name='operation',
+            field=models.CharField(choices=[('create', 'Create'), ('delete', 'Delete')], max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='chatroomoutbox',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='pending', max_length=10),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-19 04:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('friend', '0005_chatroomoutbox_chatroom_id_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='block',
+            index=models.Index(fields=['blocked', 'blocker'], name='block_reverse_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendrequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['to_user', '-created_at', '-id'], name='friend_request_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendrequest',
+            index=models.Index(fields=['to_user', 'from_user'], name='friend_request_reverse_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendship',
+            index=models.Index(fields=['user2', 'user1'], name='friendship_reverse_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='friendship',
+            constraint=models.CheckConstraint(condition=models.Q(('user1__lt', models.F('user2'))), name='friendship_user1_lt_user2'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 
 User = get_user_model()
@@ -26,6 +27,25 @@ class FriendRequest(models.Model):
                 name='unique_friend_request'
             )
         ]
+        indexes = [
+            # 받은 요청 목록 (to_user, status='pending', 최신순 키셋)
+            models.Index(
+                fields=['to_user', '-created_at', '-id'],
+                condition=models.Q(status='pending'),
+                name='friend_request_pending_idx'
+            ),
+            # 반대 방향 요청 확인 (to_user, from_user)
+            models.Index(fields=['to_user', 'from_user'], name='friend_request_reverse_idx'),
+        ]
+
+
+class FriendshipQuerySet(models.QuerySet):
+    # user1 < user2 순서로 저장되므로 OR 없이 등호 조건 하나로 조회
+    def between(self, user_a_id, user_b_id):
+        return self.filter(user1_id=min(user_a_id, user_b_id), user2_id=max(user_a_id, user_b_id))
+
+    def of_user(self, user_id):
+        return self.filter(models.Q(user1_id=user_id) | models.Q(user2_id=user_id))
 
 
 class Friendship(models.Model):
@@ -33,6 +53,8 @@ class Friendship(models.Model):
     user2 = models.ForeignKey(User, related_name="friends_to", on_delete=models.CASCADE)
     chatroom_id = models.IntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now=True)
+
+    objects = FriendshipQuerySet.as_manager()
     
     class Meta:
         constraints = [
@@ -40,7 +62,15 @@ class Friendship(models.Model):
                 # 한 쌍의 친구 관계는 한 번만 저장
                 fields=['user1', 'user2'],
                 name='unique_friendship'
-            )
+            ),
+            models.CheckConstraint(
+                condition=models.Q(user1__lt=models.F('user2')),
+                name='friendship_user1_lt_user2'
+            ),
+        ]
+        indexes = [
+            # user2 쪽에서 조회하는 경우 (친구 목록의 반대 방향)
+            models.Index(fields=['user2', 'user1'], name='friendship_reverse_idx'),
         ]
         
     def save(self, *args, **kwargs):
@@ -55,4 +85,45 @@ class Block(models.Model):
     created_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        unique_together = ['blocker', 'blocked']
\ No newline at end of file
+        unique_together = ['blocker', 'blocked']
+        indexes = [
+            # 나를 차단한 사용자 확인 (blocked, blocker)
+            models.Index(fields=['blocked', 'blocker'], name='block_reverse_idx'),
+        ]
+
+
+# 채팅 서비스 호출을 트랜잭션 밖으로 빼기 위한 outbox
+# Friendship 변경과 같은 트랜잭션에서 기록되고 process_chat_outbox 워커가 처리
+class ChatRoomOutbox(models.Model):
+    operation = models.CharField(
+        max_length=10,
+        choices=[
+            ('create', 'Create'),
+            ('delete', 'Delete'),
+        ]
+    )
+    friendship = models.ForeignKey(Friendship, related_name="chatroom_operations", null=True, on_delete=models.SET_NULL)
+    chatroom_id = models.IntegerField(null=True, blank=True)
+    # 채팅 서비스에 Idempotency-Key 헤더로 전달 (create:<friendship_id>, delete:<chatroom_id>)
+    idempotency_key = models.CharField(max_length=64, unique=True, null=True)
+    # 채팅 서비스 호출 시 이 사용자의 토큰을 발급해 사용
+    actor = models.ForeignKey(User, related_name="chatroom_operations", on_delete=models.CASCADE)
+    status = models.CharField(
+        max_length=10,
+        choices=[
+            ('pending', 'Pending'),
+            ('done', 'Done'),
+            ('failed', 'Failed'),
+            ('cancelled', 'Cancelled'),
+        ],
+        default='pending'
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='chat_outbox_due_idx'),
+        ]
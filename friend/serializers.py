@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import FriendRequest, Friendship
 from django.contrib.auth import get_user_model
@@ -13,4 +14,11 @@ class FriendRequestCreateSerializer(serializers.ModelSerializer):
 class FriendshipSerializer(serializers.ModelSerializer):
     class Meta:
         model = Friendship
-        fields = ['user1', 'user2', 'created_at', 'chatroom_id']
\ No newline at end of file
+        fields = ['user1', 'user2', 'created_at', 'chatroom_id']
+
+class BulkUserIdsSerializer(serializers.Serializer):
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BULK_BLOCK_MAX_USERS
+    )
@@ -1,60 +1,100 @@
+import asyncio
+import logging
+from datetime import timedelta
+from itertools import groupby
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models import Q, F, Case, When, Exists, OuterRef, Subquery, Value
+from django.db.models.functions import Least, Greatest
+from django.utils import timezone
+from django.core.files.storage import default_storage
 from config.services import get_chatroom, delete_chatroom, format_datetime
-from channels.layers import get_channel_layer
-from user_management.redis_utils import get_channel_name
-from asgiref.sync import async_to_sync
+from config.pagination import decode_cursor, paginate
+from datetime import datetime
+from user_management.redis_utils import (
+    get_online_status,
+    is_user_online,
+    swap_presence_state,
+    add_blocks,
+    remove_blocks,
+    check_blocks,
+    scan_block_keys,
+    BLOCKS_KEY,
+    replace_block_sets,
+    delete_keys,
+)
+from redis.exceptions import RedisError
+from user_management.services import NotificationService
+from asgiref.sync import sync_to_async
 from django.db import transaction
-from .models import FriendRequest, Friendship, Block
-from user_management.services import UserService
+from rest_framework_simplejwt.tokens import AccessToken
+from .models import FriendRequest, Friendship, Block, ChatRoomOutbox
 from config.custom_validation_error import CustomValidationError
 from config.error_type import ErrorType
 from django.db.utils import IntegrityError
 
+logger = logging.getLogger(__name__)
+
 User = get_user_model()
 
 class FriendService:
+    # 두 사용자 사이의 관계(차단, 요청, 친구 여부)를 한 번의 쿼리로 조회
+    @staticmethod
+    async def get_relationship_status(from_user_id, nickname):
+        to_user = OuterRef('pk')
+        return await User.objects.filter(nickname=nickname).annotate(
+            from_nickname=Subquery(User.objects.filter(id=from_user_id).values('nickname')[:1]),
+            is_blocked=Exists(Block.objects.filter(
+                Q(blocker=to_user, blocked_id=from_user_id) | Q(blocker_id=from_user_id, blocked=to_user)
+            )),
+            has_request=Exists(FriendRequest.objects.filter(
+                Q(from_user_id=from_user_id, to_user=to_user) | Q(from_user=to_user, to_user_id=from_user_id)
+            )),
+            is_friend=Exists(Friendship.objects.filter(
+                user1_id=Least(to_user, Value(from_user_id)),
+                user2_id=Greatest(to_user, Value(from_user_id))
+            )),
+        ).values('id', 'from_nickname', 'is_blocked', 'has_request', 'is_friend').afirst()
+
+
     @staticmethod
     async def send_friend_request(from_user_id, nickname):
-        try:
-            from_user = await User.objects.aget(id=from_user_id)
-            to_user = await User.objects.aget(nickname=nickname)
-        except User.DoesNotExist:
+        status = await FriendService.get_relationship_status(from_user_id, nickname)
+        if status is None or status['from_nickname'] is None:
             raise CustomValidationError(ErrorType.USER_NOT_FOUND)
 
-        if from_user == to_user:
+        if status['id'] == from_user_id:
             raise CustomValidationError(ErrorType.SELF_FRIEND_REQUEST)
 
-        if await Block.objects.filter(blocker=to_user, blocked=from_user).aexists() or \
-            await Block.objects.filter(blocker=from_user, blocked=to_user).aexists():
+        if status['is_blocked']:
             raise CustomValidationError(ErrorType.FRIEND_REQUEST_BLOCKED)
 
-        if await FriendRequest.objects.filter(Q(from_user=from_user, to_user=to_user) | Q(from_user=to_user, to_user=from_user)).aexists():
+        if status['has_request']:
             raise CustomValidationError(ErrorType.FRIEND_REQUEST_ALREADY_EXISTS)
 
-        if await Friendship.objects.filter(Q(user1=from_user, user2=to_user) | Q(user1=to_user, user2=from_user)).aexists():
+        if status['is_friend']:
             raise CustomValidationError(ErrorType.ALREADY_FRIENDS)
 
-        friend_request = await FriendRequest.objects.acreate(from_user=from_user, to_user=to_user, status="pending")
-        await FriendService.send_friend_request_notification(from_user_id, to_user.id, friend_request.id, friend_request.created_at)
+        try:
+            friend_request = await FriendRequest.objects.acreate(from_user_id=from_user_id, to_user_id=status['id'], status="pending")
+        except IntegrityError:
+            # 동시에 들어온 같은 요청
+            raise CustomValidationError(ErrorType.FRIEND_REQUEST_ALREADY_EXISTS)
+        await FriendService.send_friend_request_notification(
+            status['from_nickname'], status['id'], friend_request.id, friend_request.created_at
+        )
 
 
     @staticmethod
-    async def send_friend_request_notification(from_user_id, to_user_id, friend_request_id, created_at):
-        channel_layer = get_channel_layer()
-        channel_name = await get_channel_name(to_user_id)
-        if not channel_name:
-            return
-
-        from_user = await UserService.get_user_name(from_user_id)
+    async def send_friend_request_notification(from_nickname, to_user_id, friend_request_id, created_at):
         created_at_str = format_datetime(created_at)
-        await channel_layer.send(
-            channel_name,
+        await NotificationService.fan_out(
+            [to_user_id],
             {
                 "type": "friend.request",
                 "content": {
                     "id": friend_request_id,
-                    "from_user": from_user,
+                    "from_user": from_nickname,
                     "created_at": created_at_str
                 }
             }
@@ -62,7 +102,7 @@ class FriendService:
 
 
     @staticmethod
-    def respond_to_friend_request(request_id, action, token):
+    def respond_to_friend_request(request_id, action):
         try:
             friend_request = FriendRequest.objects.get(id=request_id, status="pending")
         except FriendRequest.DoesNotExist:
@@ -77,91 +117,141 @@ class FriendService:
                 friend_request.save()
 
                 friendship = Friendship.objects.create(
-                    user1=friend_request.from_user,
-                    user2=friend_request.to_user
+                    user1_id=friend_request.from_user_id,
+                    user2_id=friend_request.to_user_id
                 )
 
-                # ChatRoom 생성 API 호출
-                chatroom_data = async_to_sync(get_chatroom)(
-                    friend_request.from_user.id,
-                    friend_request.to_user.id,
-                    token
+                # ChatRoom 생성은 커밋 이후 outbox 워커가 처리
+                ChatRoomOutbox.objects.create(
+                    operation="create",
+                    friendship=friendship,
+                    actor_id=friend_request.from_user_id,
+                    idempotency_key=f"create:{friendship.id}"
                 )
-                if chatroom_data is None:
-                    raise CustomValidationError(ErrorType.CHATROOM_CREATION_FAILED)
-
-                # ChatRoom ID 저장
-                friendship.chatroom_id = chatroom_data['id']
-                friendship.save()
 
             elif action == "reject":
                 friend_request.delete()                
                 
 
+    # 받은 요청을 최신순 (created_at, id) 키셋으로 조회
     @staticmethod
-    def get_received_friend_requests(user_id):
-        return FriendRequest.objects.filter(
+    def get_received_requests_queryset(user_id, position, page_size):
+        friend_requests = FriendRequest.objects.filter(
             to_user_id = user_id,
             status = "pending"
-        ).values("id", "from_user__nickname", "created_at")
+        )
+        if position is not None:
+            created_at, request_id = position
+            friend_requests = friend_requests.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=request_id)
+            )
+        return friend_requests.order_by("-created_at", "-id").values(
+            "id", "from_user__nickname", "created_at"
+        )[:page_size + 1]
 
 
     @staticmethod
-    def get_friends_list(user_id):
-        try:
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
-            return
-        friendships = Friendship.objects.filter(Q(user1=user) | Q(user2=user)).select_related('user1', 'user2')
+    def get_received_friend_requests(user_id, cursor, page_size):
+        position = decode_cursor(cursor)
+        if position is not None:
+            try:
+                position = (datetime.fromisoformat(position[0]), int(position[1]))
+            except (TypeError, ValueError, IndexError, KeyError):
+                raise CustomValidationError(ErrorType.INVALID_CURSOR)
+
+        return paginate(
+            FriendService.get_received_requests_queryset(user_id, position, page_size),
+            page_size,
+            lambda friend_request: [friend_request["created_at"].isoformat(), friend_request["id"]]
+        )
+
+
+    # 친구 정보만 Friendship.id 키셋으로 조회 (User 인스턴스 생성 없음)
+    @staticmethod
+    def get_friends_queryset(user_id, last_id, page_size):
+        def friend_field(field):
+            return Case(
+                When(user1_id=user_id, then=F(f'user2__{field}')),
+                default=F(f'user1__{field}'),
+            )
+
+        friendships = Friendship.objects.of_user(user_id)
+        if last_id is not None:
+            friendships = friendships.filter(id__gt=last_id)
+        return friendships.annotate(
+            friend_id=friend_field('id'),
+            friend_nickname=friend_field('nickname'),
+            friend_avatar=friend_field('avatar'),
+            friend_avatar_thumbnail=friend_field('avatar_thumbnail'),
+        ).order_by('id').values(
+            'id', 'friend_id', 'friend_nickname', 'friend_avatar', 'friend_avatar_thumbnail', 'chatroom_id'
+        )[:page_size + 1]
+
+
+    @staticmethod
+    async def get_friends_list(user_id, cursor, page_size):
+        last_id = decode_cursor(cursor)
+        if last_id is not None and not isinstance(last_id, int):
+            raise CustomValidationError(ErrorType.INVALID_CURSOR)
+
+        friendships = FriendService.get_friends_queryset(user_id, last_id, page_size)
+        friendships, next_cursor = paginate(
+            [friendship async for friendship in friendships],
+            page_size,
+            lambda friendship: friendship['id']
+        )
+
+        # 친구들의 접속 여부를 한 번에 조회
+        online_status = await get_online_status([friendship['friend_id'] for friendship in friendships])
+
         friends_list = []
         for friendship in friendships:
-            friend_user = friendship.user1 if friendship.user2 == user else friendship.user2
-            is_online = async_to_sync(get_channel_name)(friend_user.id) is not None
             friend_detail = {
-                "friend_id": friend_user.id,
-                "nickname": friend_user.nickname,
-                "avatar": friend_user.avatar.url,
-                "chatroom_id": friendship.chatroom_id,
-                "is_online": is_online,
+                "friend_id": friendship['friend_id'],
+                "nickname": friendship['friend_nickname'],
+                # 썸네일이 없는 기존 아바타는 원본 경로 사용
+                "avatar": default_storage.url(friendship['friend_avatar_thumbnail'] or friendship['friend_avatar']),
+                "chatroom_id": friendship['chatroom_id'],
+                "is_online": online_status.get(friendship['friend_id'], False),
             }
             friends_list.append(friend_detail)
-            
-        return friends_list
+
+        return friends_list, next_cursor
 
 
     @staticmethod
-    def delete_friend(user_id, friend_id, token):
+    def delete_friend(user_id, friend_id):
         try:
             user = User.objects.get(id=user_id)
             friend = User.objects.get(id=friend_id)
         except User.DoesNotExist:
             raise CustomValidationError(ErrorType.USER_NOT_FOUND)
 
-        try:
-            friendship = Friendship.objects.get(Q(user1=user, user2=friend) | Q(user1=friend, user2=user))
-        except Friendship.DoesNotExist:
-            raise CustomValidationError(ErrorType.FRIENDSHIP_NOT_FOUND)
-
-        FriendRequest.objects.filter(Q(from_user=user, to_user=friend) | Q(from_user=friend, to_user=user)).delete()
+        with transaction.atomic():
+            try:
+                friendship = Friendship.objects.between(user.id, friend.id).get()
+            except Friendship.DoesNotExist:
+                raise CustomValidationError(ErrorType.FRIENDSHIP_NOT_FOUND)
 
-        # ChatRoom 삭제 API 호출
-        is_chatroom_deleted = async_to_sync(delete_chatroom)(friendship.chatroom_id, token)
-        if not is_chatroom_deleted:
-            raise CustomValidationError(ErrorType.CHATROOM_DELETION_FAILED)
+            FriendRequest.objects.filter(Q(from_user=user, to_user=friend) | Q(from_user=friend, to_user=user)).delete()
 
-        friendship.delete()
+            # ChatRoom 삭제는 커밋 이후 outbox 워커가 처리
+            ChatRoomOutboxService.enqueue_friendship_deletion(friendship, user_id)
+            friendship.delete()
 
 
     @staticmethod
-    def block_friend(user_id, friend_id, token):
+    def block_friend(user_id, friend_id):
         try:
             blocker = User.objects.get(id=user_id)
             blocked = User.objects.get(id=friend_id)
-            Block.objects.create(blocker=blocker, blocked=blocked)
-            
-            FriendRequest.objects.filter(Q(from_user=blocker, to_user=blocked) | Q(from_user=blocked, to_user=blocker)).delete()
-            if Friendship.objects.filter(Q(user1=blocker, user2=blocked) | Q(user1=blocked, user2=blocker)).exists():
-                FriendService.delete_friend(user_id, friend_id, token)
+            with transaction.atomic():
+                Block.objects.create(blocker=blocker, blocked=blocked)
+                BlockCacheService.on_blocked(blocker.id, [blocked.id])
+
+                FriendRequest.objects.filter(Q(from_user=blocker, to_user=blocked) | Q(from_user=blocked, to_user=blocker)).delete()
+                if Friendship.objects.between(blocker.id, blocked.id).exists():
+                    FriendService.delete_friend(user_id, friend_id)
 
         except User.DoesNotExist:
             raise CustomValidationError(ErrorType.USER_NOT_FOUND)
@@ -171,15 +261,314 @@ class FriendService:
             raise e
 
 
+    # 중복과 자기 자신을 제외한 대상 id 집합
+    @staticmethod
+    def _get_bulk_target_ids(user_id, target_ids):
+        target_ids = set(target_ids) - {user_id}
+        if len(target_ids) > settings.BULK_BLOCK_MAX_USERS:
+            raise CustomValidationError(ErrorType.VALIDATION_ERROR)
+        return target_ids
+
+    @staticmethod
+    def block_users(user_id, target_ids):
+        target_ids = FriendService._get_bulk_target_ids(user_id, target_ids)
+        # 존재하지 않는 사용자는 건너뜀
+        target_ids = set(User.objects.filter(id__in=target_ids).values_list('id', flat=True))
+        if not target_ids:
+            return 0
+
+        with transaction.atomic():
+            # 이미 차단된 대상은 건너뛰고 새로 차단한 수만 반환 (동시 요청은 unique 제약으로 건너뜀)
+            already_blocked = set(
+                Block.objects.filter(blocker_id=user_id, blocked_id__in=target_ids).values_list('blocked_id', flat=True)
+            )
+            new_target_ids = target_ids - already_blocked
+            Block.objects.bulk_create(
+                [Block(blocker_id=user_id, blocked_id=target_id) for target_id in new_target_ids],
+                ignore_conflicts=True
+            )
+            BlockCacheService.on_blocked(user_id, target_ids)
+            FriendRequest.objects.filter(
+                Q(from_user_id=user_id, to_user_id__in=target_ids) | Q(from_user_id__in=target_ids, to_user_id=user_id)
+            ).delete()
+
+            friendships = Friendship.objects.of_user(user_id).filter(
+                Q(user1_id__in=target_ids) | Q(user2_id__in=target_ids)
+            )
+            # ChatRoom 삭제는 커밋 이후 outbox 워커가 처리
+            ChatRoomOutboxService.enqueue_friendships_deletion(list(friendships.only('id', 'chatroom_id')), user_id)
+            friendships.delete()
+        return len(new_target_ids)
+
+
+    @staticmethod
+    def unblock_users(user_id, target_ids):
+        target_ids = FriendService._get_bulk_target_ids(user_id, target_ids)
+        deleted, _ = Block.objects.filter(blocker_id=user_id, blocked_id__in=target_ids).delete()
+        BlockCacheService.on_unblocked(user_id, target_ids)
+        return deleted
+
+
     @staticmethod
     def unblock_friend(user_id, friend_id):
         try:
             blocker = User.objects.get(id=user_id)
             blocked = User.objects.get(id=friend_id)
             Block.objects.get(blocker=blocker, blocked=blocked).delete()
+            BlockCacheService.on_unblocked(blocker.id, [blocked.id])
         except User.DoesNotExist:
             raise CustomValidationError(ErrorType.USER_NOT_FOUND)
         except Block.DoesNotExist:
             raise CustomValidationError(ErrorType.BLOCK_NOT_FOUND)
         except CustomValidationError as e:
-            raise e
\ No newline at end of file
+            raise e
+
+
+# Block 테이블을 Redis 집합(blocks:{blocker_id})으로 복제
+# 다른 서비스의 메시지 경로 차단 확인은 DB를 거치지 않고 이 집합만 조회
+class BlockCacheService:
+    # 커밋된 뒤에만 반영 (롤백된 차단이 남지 않도록)
+    @staticmethod
+    def on_blocked(blocker_id, blocked_ids):
+        blocked_ids = list(blocked_ids)
+        transaction.on_commit(lambda: BlockCacheService._apply(add_blocks, blocker_id, blocked_ids))
+
+    @staticmethod
+    def on_unblocked(blocker_id, blocked_ids):
+        blocked_ids = list(blocked_ids)
+        transaction.on_commit(lambda: BlockCacheService._apply(remove_blocks, blocker_id, blocked_ids))
+
+    # Redis 장애 시에도 요청은 성공시키고, rebuild_block_cache로 복구
+    @staticmethod
+    def _apply(write, blocker_id, blocked_ids):
+        try:
+            write(blocker_id, blocked_ids)
+        except RedisError:
+            logger.warning("Failed to update block cache for user %s", blocker_id, exc_info=True)
+
+    @staticmethod
+    async def check_pairs(pairs):
+        try:
+            return await check_blocks(pairs)
+        except RedisError:
+            raise CustomValidationError(ErrorType.BLOCK_CACHE_UNAVAILABLE)
+
+    # DB 기준으로 모든 차단 집합을 다시 만들고, DB에 없는 집합은 삭제
+    @staticmethod
+    def rebuild(batch_size=1000):
+        stale_keys = scan_block_keys(batch_size)
+        blocker_count = block_count = 0
+        block_sets = {}
+        pending_rows = 0
+
+        rows = Block.objects.order_by('blocker_id').values_list('blocker_id', 'blocked_id').iterator(chunk_size=batch_size)
+        for blocker_id, group in groupby(rows, key=lambda row: row[0]):
+            blocked_ids = [blocked_id for _, blocked_id in group]
+            block_sets[blocker_id] = blocked_ids
+            stale_keys.discard(BLOCKS_KEY.format(blocker_id).encode())
+            blocker_count += 1
+            block_count += len(blocked_ids)
+            pending_rows += len(blocked_ids)
+            if pending_rows >= batch_size:
+                replace_block_sets(block_sets)
+                block_sets = {}
+                pending_rows = 0
+        if block_sets:
+            replace_block_sets(block_sets)
+
+        stale_keys = list(stale_keys)
+        for start in range(0, len(stale_keys), batch_size):
+            delete_keys(stale_keys[start:start + batch_size])
+        return blocker_count, block_count, len(stale_keys)
+
+
+# 접속 상태 변화를 온라인 친구들에게 push (친구 목록 polling 대체)
+class PresenceService:
+    # 이 워커에서 사용자별로 예약된 알림, 짧은 시간 안의 접속/종료는 하나로 합침
+    _scheduled = {}
+
+    @staticmethod
+    async def get_friend_ids(user_id):
+        return [
+            friend_id async for friend_id in Friendship.objects.of_user(user_id).annotate(
+                friend_id=Case(
+                    When(user1_id=user_id, then=F('user2_id')),
+                    default=F('user1_id'),
+                )
+            ).values_list('friend_id', flat=True)
+        ]
+
+    @staticmethod
+    async def get_online_friend_ids(user_id):
+        friend_ids = await PresenceService.get_friend_ids(user_id)
+        online_status = await get_online_status(friend_ids)
+        return [friend_id for friend_id in friend_ids if online_status[friend_id]]
+
+    # 첫 연결 또는 마지막 연결 종료 시 호출
+    @staticmethod
+    def schedule_announcement(user_id):
+        if user_id in PresenceService._scheduled:
+            return
+        task = asyncio.create_task(PresenceService._announce_later(user_id))
+        PresenceService._scheduled[user_id] = task
+        task.add_done_callback(lambda _: PresenceService._scheduled.pop(user_id, None))
+
+    @staticmethod
+    async def _announce_later(user_id):
+        await asyncio.sleep(settings.PRESENCE_DEBOUNCE_SECONDS)
+        try:
+            await PresenceService.announce(user_id)
+        except Exception:
+            logger.warning("Failed to announce presence of user %s", user_id, exc_info=True)
+
+    # 마지막으로 알린 상태와 다를 때만 전송 (여러 워커가 동시에 호출해도 한 번만 전송)
+    @staticmethod
+    async def announce(user_id, is_online=None):
+        if is_online is None:
+            is_online = await is_user_online(user_id)
+        if await swap_presence_state(user_id, is_online) == is_online:
+            return 0
+
+        result = await NotificationService.fan_out(
+            await PresenceService.get_friend_ids(user_id),
+            {
+                "type": "friend.presence",
+                "content": {
+                    "user_id": user_id,
+                    "is_online": is_online
+                }
+            }
+        )
+        return result["delivered"]
+
+
+class ChatRoomOutboxService:
+    # Friendship 삭제와 같은 트랜잭션에서 호출
+    @staticmethod
+    def enqueue_friendship_deletion(friendship, actor_id):
+        ChatRoomOutboxService.enqueue_friendships_deletion([friendship], actor_id)
+
+    @staticmethod
+    def enqueue_friendships_deletion(friendships, actor_id):
+        if not friendships:
+            return
+        # 아직 처리되지 않은 생성 작업은 취소
+        ChatRoomOutbox.objects.filter(
+            friendship_id__in=[friendship.id for friendship in friendships],
+            operation="create",
+            status="pending"
+        ).update(status="cancelled")
+        ChatRoomOutboxService.enqueue_chatroom_deletions(
+            [friendship.chatroom_id for friendship in friendships if friendship.chatroom_id is not None],
+            actor_id
+        )
+
+    # 같은 채팅방에 대한 삭제 요청은 idempotency key로 하나로 합침
+    @staticmethod
+    def enqueue_chatroom_deletion(chatroom_id, actor_id):
+        ChatRoomOutbox.objects.get_or_create(
+            idempotency_key=f"delete:{chatroom_id}",
+            defaults={
+                "operation": "delete",
+                "chatroom_id": chatroom_id,
+                "actor_id": actor_id,
+            }
+        )
+
+    # 여러 채팅방 삭제를 한 번의 INSERT로 등록, 이미 등록된 삭제는 건너뜀
+    @staticmethod
+    def enqueue_chatroom_deletions(chatroom_ids, actor_id):
+        ChatRoomOutbox.objects.bulk_create(
+            [
+                ChatRoomOutbox(
+                    operation="delete",
+                    chatroom_id=chatroom_id,
+                    idempotency_key=f"delete:{chatroom_id}",
+                    actor_id=actor_id,
+                )
+                for chatroom_id in set(chatroom_ids)
+            ],
+            ignore_conflicts=True
+        )
+
+    # 처리할 작업을 가져와 다른 워커가 가져가지 않도록 next_attempt_at을 미룸
+    @staticmethod
+    def claim_due_operations(batch_size):
+        now = timezone.now()
+        with transaction.atomic():
+            operations = list(
+                ChatRoomOutbox.objects.select_for_update(skip_locked=True).filter(
+                    status="pending",
+                    next_attempt_at__lte=now
+                ).select_related('friendship').order_by('id')[:batch_size]
+            )
+            ChatRoomOutbox.objects.filter(id__in=[operation.id for operation in operations]).update(
+                next_attempt_at=now + timedelta(seconds=settings.CHAT_OUTBOX_LEASE_SECONDS)
+            )
+        return operations
+
+    # 워커의 이벤트 루프에서 실행되어 채팅 서비스 커넥션을 배치 간에 재사용
+    # 배치 안의 호출은 풀링된 커넥션으로 동시에 전송
+    @staticmethod
+    async def process_due_operations(batch_size):
+        operations = await sync_to_async(ChatRoomOutboxService.claim_due_operations)(batch_size)
+        if not operations:
+            return 0
+
+        results = await asyncio.gather(
+            *(ChatRoomOutboxService._run_operation(operation) for operation in operations),
+            return_exceptions=True
+        )
+        await sync_to_async(ChatRoomOutboxService._record_results)(operations, results)
+        return len(operations)
+
+    @staticmethod
+    def _record_results(operations, results):
+        for operation, result in zip(operations, results):
+            if isinstance(result, Exception) or result is None:
+                ChatRoomOutboxService._mark_failed(operation, result)
+            else:
+                ChatRoomOutboxService._mark_done(operation, result)
+
+    @staticmethod
+    async def _run_operation(operation):
+        token = str(AccessToken.for_user(User(id=operation.actor_id)))
+        idempotency_key = operation.idempotency_key or f"outbox:{operation.id}"
+
+        if operation.operation == "delete":
+            return await delete_chatroom(operation.chatroom_id, token, idempotency_key)
+
+        # 그 사이 친구 관계가 삭제되었다면 생성할 필요 없음
+        if operation.friendship is None:
+            return {}
+        return await get_chatroom(
+            operation.friendship.user1_id,
+            operation.friendship.user2_id,
+            token,
+            idempotency_key
+        )
+
+    @staticmethod
+    def _mark_done(operation, result):
+        with transaction.atomic():
+            if operation.operation == "create" and 'id' in result:
+                updated = Friendship.objects.filter(id=operation.friendship_id).update(chatroom_id=result['id'])
+                # 생성 도중 친구 관계가 삭제되었다면 만들어진 채팅방도 정리
+                if not updated:
+                    ChatRoomOutboxService.enqueue_chatroom_deletion(result['id'], operation.actor_id)
+            operation.status = "done"
+            operation.save(update_fields=['status'])
+
+    @staticmethod
+    def _mark_failed(operation, error):
+        operation.attempts += 1
+        operation.last_error = str(error) if error else "Unexpected chat service response."
+        if operation.attempts >= settings.CHAT_OUTBOX_MAX_ATTEMPTS:
+            operation.status = "failed"
+        # 지수 백오프
+        delay = min(
+            settings.CHAT_OUTBOX_RETRY_DELAY * 2 ** (operation.attempts - 1),
+            settings.CHAT_OUTBOX_MAX_RETRY_DELAY
+        )
+        operation.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        operation.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
@@ -1,10 +1,14 @@
 from rest_framework.test import APITestCase, APIClient
 from django.urls import reverse
-from .models import FriendRequest, Friendship
+from django.test import override_settings
+from asgiref.sync import async_to_sync
+from .models import FriendRequest, Friendship, Block, ChatRoomOutbox
+from .services import ChatRoomOutboxService, FriendService, PresenceService
+from django.utils import timezone
+from config.pagination import encode_cursor
 from django.contrib.auth import get_user_model
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock
 from rest_framework_simplejwt.tokens import RefreshToken
-from unittest.mock import patch
 
 User = get_user_model()
 
@@ -18,22 +22,42 @@ class FriendRequestTest(APITestCase):
         refresh = RefreshToken.for_user(self.user1)
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {str(refresh.access_token)}')
         
-    def test_send_friend_request_success(self):
-        # 친구 요청 성공
+    @patch('friend.services.NotificationService.fan_out', new_callable=AsyncMock)
+    def test_send_friend_request_success(self, mock_fan_out):
+        # 친구 요청 성공 (관계 확인 한 번 + 생성 한 번)
         url = reverse('request')
-        data = {'to_user_id': self.user2.id}
-        response = self.client.post(url, data)
+        data = {'nickname': self.user2.nickname}
+        with self.assertNumQueries(2):
+            response = self.client.post(url, data)
         self.assertEqual(response.status_code, 201)
         self.assertEqual(FriendRequest.objects.count(), 1)
 
     def test_send_friend_request_duplicate(self):
-        # 중복된 친구 요청
-        FriendRequest.objects.create(from_user=self.user1, to_user=self.user2)
+        # 중복된 친구 요청 (반대 방향 포함)
+        FriendRequest.objects.create(from_user=self.user2, to_user=self.user1)
         url = reverse('request')
-        data = {'to_user_id': self.user2.id}
+        data = {'nickname': self.user2.nickname}
         response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 409)
+
+    def test_send_friend_request_blocked(self):
+        Block.objects.create(blocker=self.user2, blocked=self.user1)
+        response = self.client.post(reverse('request'), {'nickname': self.user2.nickname})
+        self.assertEqual(response.status_code, 403)
+
+    def test_send_friend_request_already_friends(self):
+        Friendship.objects.create(user1=self.user1, user2=self.user2)
+        response = self.client.post(reverse('request'), {'nickname': self.user2.nickname})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['message'], "You are already friends.")
+
+    def test_send_friend_request_to_self_or_unknown(self):
+        response = self.client.post(reverse('request'), {'nickname': self.user1.nickname})
         self.assertEqual(response.status_code, 400)
 
+        response = self.client.post(reverse('request'), {'nickname': 'nobody'})
+        self.assertEqual(response.status_code, 404)
+
 
 class RespondToFriendRequestTest(APITestCase):
     def setUp(self):
@@ -45,12 +69,8 @@ class RespondToFriendRequestTest(APITestCase):
         refresh = RefreshToken.for_user(self.user1)
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {str(refresh.access_token)}')
 
-    # TODO: 에러 수정 필요
-    @patch('config.services.get_chatroom')
-    def test_accept_friend_request_success(self, mock_get_chatroom):
-        # 친구 요청 수락
-        mock_get_chatroom.return_value = {'chatroom_id': 1}
-        
+    def test_accept_friend_request_success(self):
+        # 친구 요청 수락 (채팅방 생성은 outbox에 기록만 하고 바로 커밋)
         friend_request = FriendRequest.objects.create(from_user=self.user2, to_user=self.user1)
         url = reverse('respond')
         data = {'friend_request_id': friend_request.id, 'action': 'accept'}
@@ -60,6 +80,192 @@ class RespondToFriendRequestTest(APITestCase):
         self.assertEqual(Friendship.objects.count(), 1)
         self.assertEqual(Friendship.objects.first().user1.id, min(self.user1.id, self.user2.id))
         self.assertEqual(Friendship.objects.first().user2.id, max(self.user1.id, self.user2.id))
+        self.assertTrue(ChatRoomOutbox.objects.filter(
+            operation="create",
+            friendship=Friendship.objects.first(),
+            status="pending"
+        ).exists())
+
+
+class ChatRoomOutboxTest(APITestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(email="user1@example.com", password="password1", nickname="user1")
+        self.user2 = User.objects.create_user(email="user2@example.com", password="password1", nickname="user2")
+        self.friendship = Friendship.objects.create(user1=self.user1, user2=self.user2)
+        self.operation = ChatRoomOutbox.objects.create(operation="create", friendship=self.friendship, actor=self.user1)
+
+    @patch('friend.services.get_chatroom', new_callable=AsyncMock, return_value={'id': 42})
+    def test_create_chatroom(self, mock_get_chatroom):
+        processed = async_to_sync(ChatRoomOutboxService.process_due_operations)(10)
+
+        self.assertEqual(processed, 1)
+        self.friendship.refresh_from_db()
+        self.operation.refresh_from_db()
+        self.assertEqual(self.friendship.chatroom_id, 42)
+        self.assertEqual(self.operation.status, "done")
+        self.assertEqual(mock_get_chatroom.await_args.args[:2], (self.user1.id, self.user2.id))
+
+    @patch('friend.services.get_chatroom', new_callable=AsyncMock, return_value=None)
+    def test_failed_operation_is_retried_later(self, mock_get_chatroom):
+        async_to_sync(ChatRoomOutboxService.process_due_operations)(10)
+
+        self.operation.refresh_from_db()
+        self.assertEqual(self.operation.status, "pending")
+        self.assertEqual(self.operation.attempts, 1)
+        # 재시도 시각 전에는 다시 가져가지 않음
+        self.assertEqual(async_to_sync(ChatRoomOutboxService.process_due_operations)(10), 0)
+
+    @patch('friend.services.get_chatroom', new_callable=AsyncMock, return_value=None)
+    def test_retry_delay_grows_exponentially(self, mock_get_chatroom):
+        delays = []
+        for _ in range(3):
+            ChatRoomOutbox.objects.filter(id=self.operation.id).update(next_attempt_at=timezone.now())
+            before = timezone.now()
+            async_to_sync(ChatRoomOutboxService.process_due_operations)(10)
+            self.operation.refresh_from_db()
+            delays.append(round((self.operation.next_attempt_at - before).total_seconds()))
+
+        self.assertEqual(delays, [10, 20, 40])
+
+    @patch('friend.services.get_chatroom', new_callable=AsyncMock)
+    def test_delete_friend_uses_outbox(self, mock_get_chatroom):
+        # 채팅 서비스 호출 없이 친구 삭제가 커밋되고 생성 작업은 취소됨
+        self.friendship.chatroom_id = 7
+        self.friendship.save()
+        FriendService.delete_friend(self.user1.id, self.user2.id)
+
+        self.assertFalse(Friendship.objects.exists())
+        self.operation.refresh_from_db()
+        self.assertEqual(self.operation.status, "cancelled")
+        deletion = ChatRoomOutbox.objects.get(operation="delete")
+        self.assertEqual((deletion.chatroom_id, deletion.idempotency_key), (7, "delete:7"))
+        mock_get_chatroom.assert_not_awaited()
+
+    @patch('friend.services.delete_chatroom', new_callable=AsyncMock, return_value=True)
+    def test_duplicate_deletions_are_coalesced(self, mock_delete_chatroom):
+        ChatRoomOutbox.objects.all().delete()
+        ChatRoomOutboxService.enqueue_chatroom_deletion(7, self.user1.id)
+        ChatRoomOutboxService.enqueue_chatroom_deletion(7, self.user2.id)
+
+        async_to_sync(ChatRoomOutboxService.process_due_operations)(10)
+        mock_delete_chatroom.assert_awaited_once()
+        self.assertEqual(mock_delete_chatroom.await_args.args[0], 7)
+        self.assertEqual(mock_delete_chatroom.await_args.args[2], "delete:7")
+
+    def test_chatroom_created_after_unfriend_is_deleted(self):
+        operations = ChatRoomOutboxService.claim_due_operations(10)
+        self.friendship.delete()
+        ChatRoomOutboxService._record_results(operations, [{'id': 42}])
+
+        self.assertTrue(ChatRoomOutbox.objects.filter(operation="delete", chatroom_id=42).exists())
+
+
+class BulkBlockTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="owner@example.com", password="password1", nickname="owner")
+        self.targets = [
+            User.objects.create_user(email=f"target{i}@example.com", password="password1", nickname=f"target{i}")
+            for i in range(3)
+        ]
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {str(refresh.access_token)}')
+
+    def test_block_users(self):
+        friend, requester, blocked = self.targets
+        Friendship.objects.create(user1=self.user, user2=friend, chatroom_id=11)
+        FriendRequest.objects.create(from_user=requester, to_user=self.user)
+        Block.objects.create(blocker=self.user, blocked=blocked)
+
+        user_ids = [target.id for target in self.targets] + [self.user.id, 999999]
+        response = self.client.post(reverse('block-bulk'), {'user_ids': user_ids}, format='json')
+        self.assertEqual(response.status_code, 200)
+        # 이미 차단된 사용자는 새로 차단한 수에 포함하지 않음
+        self.assertEqual(response.data['blocked'], 2)
+        self.assertEqual(Block.objects.filter(blocker=self.user).count(), 3)
+        self.assertFalse(Friendship.objects.of_user(self.user.id).exists())
+        self.assertFalse(FriendRequest.objects.exists())
+        self.assertTrue(ChatRoomOutbox.objects.filter(operation="delete", chatroom_id=11).exists())
+
+    def test_unblock_users(self):
+        for target in self.targets:
+            Block.objects.create(blocker=self.user, blocked=target)
+
+        user_ids = [target.id for target in self.targets[:2]]
+        response = self.client.post(reverse('unblock-bulk'), {'user_ids': user_ids}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['unblocked'], 2)
+        self.assertEqual(list(Block.objects.values_list('blocked_id', flat=True)), [self.targets[2].id])
+
+    def test_bulk_block_validation(self):
+        response = self.client.post(reverse('block-bulk'), {'user_ids': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class BlockCacheTest(APITestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(email="user1@example.com", password="password1", nickname="user1")
+        self.user2 = User.objects.create_user(email="user2@example.com", password="password1", nickname="user2")
+
+    @patch('friend.services.add_blocks')
+    def test_block_is_written_through_on_commit(self, mock_add_blocks):
+        with self.captureOnCommitCallbacks(execute=True):
+            FriendService.block_friend(self.user1.id, self.user2.id)
+        mock_add_blocks.assert_called_once_with(self.user1.id, [self.user2.id])
+
+    @patch('friend.services.remove_blocks')
+    def test_unblock_is_written_through_on_commit(self, mock_remove_blocks):
+        Block.objects.create(blocker=self.user1, blocked=self.user2)
+        with self.captureOnCommitCallbacks(execute=True):
+            FriendService.unblock_users(self.user1.id, [self.user2.id])
+        mock_remove_blocks.assert_called_once_with(self.user1.id, [self.user2.id])
+
+    @override_settings(INTERNAL_API_TOKEN='secret')
+    @patch('friend.services.check_blocks', new_callable=AsyncMock, return_value=[True, False])
+    def test_block_check(self, mock_check_blocks):
+        url = reverse('block-check')
+        data = {'pairs': [[self.user1.id, self.user2.id], [self.user2.id, self.user1.id]]}
+        with self.assertNumQueries(0):
+            response = self.client.post(url, data, format='json', HTTP_X_INTERNAL_TOKEN='secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [True, False])
+        mock_check_blocks.assert_awaited_once_with([(self.user1.id, self.user2.id), (self.user2.id, self.user1.id)])
+
+    @override_settings(INTERNAL_API_TOKEN='secret')
+    def test_block_check_rejects_invalid_requests(self):
+        url = reverse('block-check')
+        response = self.client.post(url, {'pairs': [[1, 2]]}, format='json', HTTP_X_INTERNAL_TOKEN='wrong')
+        self.assertEqual(response.status_code, 401)
+        response = self.client.post(url, {'pairs': [[1]]}, format='json', HTTP_X_INTERNAL_TOKEN='secret')
+        self.assertEqual(response.status_code, 400)
+
+
+class PresenceServiceTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="user@example.com", password="password1", nickname="user")
+        self.online_friend = User.objects.create_user(email="online@example.com", password="password1", nickname="online")
+        self.offline_friend = User.objects.create_user(email="offline@example.com", password="password1", nickname="offline")
+        Friendship.objects.create(user1=self.user, user2=self.online_friend)
+        Friendship.objects.create(user1=self.user, user2=self.offline_friend)
+
+    @patch('friend.services.NotificationService.fan_out', new_callable=AsyncMock)
+    @patch('friend.services.swap_presence_state', return_value=False)
+    def test_announce_to_online_friends(self, mock_swap, mock_fan_out):
+        mock_fan_out.return_value = {"delivered": 1, "offline": 1}
+
+        sent = async_to_sync(PresenceService.announce)(self.user.id, is_online=True)
+        self.assertEqual(sent, 1)
+        user_ids, event = mock_fan_out.await_args.args
+        self.assertCountEqual(user_ids, [self.online_friend.id, self.offline_friend.id])
+        self.assertEqual(event, {"type": "friend.presence", "content": {"user_id": self.user.id, "is_online": True}})
+
+    @patch('friend.services.NotificationService.fan_out', new_callable=AsyncMock)
+    @patch('friend.services.swap_presence_state', return_value=True)
+    def test_unchanged_state_is_not_announced(self, mock_swap, mock_fan_out):
+        # 짧은 시간 안에 종료 후 재접속하면 이미 알린 상태와 같아서 전송하지 않음
+        sent = async_to_sync(PresenceService.announce)(self.user.id, is_online=True)
+        self.assertEqual(sent, 0)
+        mock_fan_out.assert_not_awaited()
 
 
 class FriendListTest(APITestCase):
@@ -72,23 +278,100 @@ class FriendListTest(APITestCase):
         refresh = RefreshToken.for_user(self.user1)
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {str(refresh.access_token)}')
 
-    # TODO: 에러 수정 필요
-    def test_friend_list_with_friends(self):
+    @patch('friend.services.get_online_status')
+    def test_friend_list_with_friends(self, mock_get_online_status):
         # 친구 목록 조회
+        mock_get_online_status.return_value = {self.user2.id: True}
         Friendship.objects.create(user1=self.user1, user2=self.user2)
         url = reverse('list')
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['id'], self.user2.id)
+        friends = response.json()['results']
+        self.assertEqual(len(friends), 1)
+        self.assertEqual(friends[0]['friend_id'], self.user2.id)
+        self.assertTrue(friends[0]['is_online'])
+        # 친구 수와 관계없이 접속 여부는 한 번만 조회
+        mock_get_online_status.assert_called_once_with([self.user2.id])
 
-    @patch('friend.views.get_friends_list', return_value=None)
-    def test_friend_list_none(self, mock_get_friends_list):
-        # 친구 목록이 None인 경우
-        mock_get_friends_list.return_value = None
-        url = reverse('list')
-        response = self.client.get(url)
+    @patch('friend.services.get_online_status', return_value={})
+    def test_friend_list_from_second_user(self, mock_get_online_status):
+        # user2 기준으로 조회해도 상대방(user1)의 정보가 반환되어야 함
+        Friendship.objects.create(user1=self.user1, user2=self.user2)
+        refresh = RefreshToken.for_user(self.user2)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {str(refresh.access_token)}')
+        response = self.client.get(reverse('list'))
 
-        self.assertEqual(response.status_code, 404)
-        self.assertEqual(response.data['message'], "Friends list is not initialized or unavailable.")
\ No newline at end of file
+        self.assertEqual(response.status_code, 200)
+        friends = response.json()['results']
+        self.assertEqual(friends[0]['friend_id'], self.user1.id)
+        self.assertEqual(friends[0]['nickname'], self.user1.nickname)
+        self.assertFalse(friends[0]['is_online'])
+
+    @patch('friend.services.get_online_status', return_value={})
+    def test_friend_list_returns_thumbnail(self, mock_get_online_status):
+        # 썸네일이 있으면 썸네일, 없으면 기존 아바타 경로를 반환
+        Friendship.objects.create(user1=self.user1, user2=self.user2)
+        response = self.client.get(reverse('list'))
+        self.assertEqual(response.json()['results'][0]['avatar'], '/media/avatars/default.png')
+
+        User.objects.filter(id=self.user2.id).update(avatar_thumbnail='avatars/abc_64.webp')
+        response = self.client.get(reverse('list'))
+        self.assertEqual(response.json()['results'][0]['avatar'], '/media/avatars/abc_64.webp')
+
+    def test_friend_list_in_schema(self):
+        # async 뷰도 API 스키마에 포함되어야 함
+        response = self.client.get(reverse('schema'), {'format': 'json'})
+        operation = response.json()['paths']['/api/user/friend/list/']['get']
+        self.assertEqual(operation['operationId'], 'user_friend_list_retrieve')
+
+@patch('friend.services.get_online_status', return_value={})
+class FriendPaginationTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()  # APIClient 선언
+        self.user = User.objects.create_user(email="user@example.com", password="password1", nickname="user")
+        self.others = [
+            User.objects.create_user(email=f"other{i}@example.com", password="password1", nickname=f"other{i}")
+            for i in range(3)
+        ]
+
+        # JWT 토큰 생성 및 헤더 추가
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {str(refresh.access_token)}')
+
+    def test_friend_list_cursor(self, mock_get_online_status):
+        # 커서를 따라가면 모든 친구를 중복 없이 조회
+        for other in self.others:
+            Friendship.objects.create(user1=self.user, user2=other)
+
+        first = self.client.get(reverse('list'), {'page_size': 2}).json()
+        self.assertEqual(len(first['results']), 2)
+        self.assertIsNotNone(first['next_cursor'])
+
+        second = self.client.get(reverse('list'), {'page_size': 2, 'cursor': first['next_cursor']}).json()
+        self.assertEqual(len(second['results']), 1)
+        self.assertIsNone(second['next_cursor'])
+
+        friend_ids = [friend['friend_id'] for friend in first['results'] + second['results']]
+        self.assertEqual(friend_ids, [other.id for other in self.others])
+
+    def test_received_requests_cursor(self, mock_get_online_status):
+        # 최신 요청부터 페이지 단위로 조회
+        for other in self.others:
+            FriendRequest.objects.create(from_user=other, to_user=self.user)
+
+        first = self.client.get(reverse('received-requests'), {'page_size': 2}).data
+        second = self.client.get(reverse('received-requests'), {'page_size': 2, 'cursor': first['next_cursor']}).data
+
+        self.assertEqual(len(first['results']), 2)
+        self.assertEqual(len(second['results']), 1)
+        self.assertIsNone(second['next_cursor'])
+        nicknames = [friend_request['from_user'] for friend_request in first['results'] + second['results']]
+        self.assertEqual(sorted(nicknames), sorted(other.nickname for other in self.others))
+
+    def test_invalid_cursor(self, mock_get_online_status):
+        response = self.client.get(reverse('list'), {'cursor': encode_cursor('abc')})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(reverse('received-requests'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
@@ -6,7 +6,10 @@ from .views import (
     FriendListView,
     DeleteFriendView,
     BlockFriendView,
-    UnblockFriendView
+    UnblockFriendView,
+    BulkBlockView,
+    BulkUnblockView,
+    BlockCheckView
 )
 
 
@@ -17,5 +20,8 @@ urlpatterns = [
     path('list/', FriendListView.as_view(), name='list'),
     path('delete/', DeleteFriendView.as_view(), name='delete'),
     path('block/', BlockFriendView.as_view(), name='block'),
-    path('unblock/', UnblockFriendView.as_view(), name='unblock')
+    path('unblock/', UnblockFriendView.as_view(), name='unblock'),
+    path('block/bulk/', BulkBlockView.as_view(), name='block-bulk'),
+    path('unblock/bulk/', BulkUnblockView.as_view(), name='unblock-bulk'),
+    path('internal/block-check/', BlockCheckView.as_view(), name='block-check')
 ]
\ No newline at end of file
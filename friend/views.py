@@ -1,11 +1,19 @@
+import json
+from django.conf import settings
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.exceptions import ValidationError, NotFound
-from drf_spectacular.utils import extend_schema
 from asgiref.sync import async_to_sync
 from rest_framework.views import APIView
-from .services import FriendService
-from config.response_builder import response_ok, response_errors
+from django.views import View
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from .services import FriendService, BlockCacheService
+from .serializers import BulkUserIdsSerializer
+from config.response_builder import response_ok, response_errors, json_response_ok, json_response_errors
+from config.pagination import get_page_size
+from config.middleware import has_internal_token
+from config.schema import document_async_view
 from config.custom_validation_error import CustomValidationError
 from config.error_type import ErrorType
 
@@ -26,7 +34,7 @@ class RespondToFriendRequestView(APIView):
         friend_request_id = request.data.get('friend_request_id')
         action = request.data.get('action')
         try:
-            FriendService.respond_to_friend_request(friend_request_id, action, request.token)
+            FriendService.respond_to_friend_request(friend_request_id, action)
             return response_ok({"message": f"Friend request {action}ed"})
         except CustomValidationError as e:
             return response_errors(errors=e)
@@ -36,7 +44,12 @@ class ReceivedFriendRequestListView(APIView):
     def get(self, request):
         try:
             user_id = request.user_id
-            friend_requests = FriendService.get_received_friend_requests(user_id)
+            page_size = get_page_size(request.query_params.get('page_size'))
+            friend_requests, next_cursor = FriendService.get_received_friend_requests(
+                user_id,
+                request.query_params.get('cursor'),
+                page_size
+            )
 
             requests = [
                 {
@@ -46,32 +59,42 @@ class ReceivedFriendRequestListView(APIView):
 				}
                 for friend_request in friend_requests
 			]
-            return response_ok(requests)
+            return response_ok({"results": requests, "next_cursor": next_cursor})
         except CustomValidationError as e:
             return response_errors(errors=e)
 
 
-class FriendListView(APIView):
-    @extend_schema(
-        summary="Get the friend list of the authenticated user",
-        responses={
-            200: "Successfully retrieved the friend list.",
-            401: "Authentication credentials were not provided or invalid.",
-            404: "Friends list is not initialized or unavailable.",
-        },
-    )
-    def get(self, request):
-        friends = FriendService.get_friends_list(request.user_id)
-        if friends is None:
-            return response_errors(errors=CustomValidationError(ErrorType.FRIENDS_LIST_UNAVAILABLE))
-        return response_ok(friends)
+# 가장 많이 호출되는 엔드포인트이므로 스레드를 점유하지 않도록 async 뷰로 처리
+@document_async_view('list', 'get', {
+    "operationId": "user_friend_list_retrieve",
+    "summary": "Get the friend list of the authenticated user",
+    "tags": ["user"],
+    "parameters": [
+        {"name": "cursor", "in": "query", "required": False, "schema": {"type": "string"},
+         "description": "next_cursor of the previous page."},
+        {"name": "page_size", "in": "query", "required": False, "schema": {"type": "integer"}},
+    ],
+    "responses": {
+        "200": {"description": "Successfully retrieved the friend list."},
+        "400": {"description": "Invalid pagination cursor or page size."},
+        "401": {"description": "Authentication credentials were not provided or invalid."},
+    },
+})
+class FriendListView(View):
+    async def get(self, request):
+        try:
+            page_size = get_page_size(request.GET.get('page_size'))
+            friends, next_cursor = await FriendService.get_friends_list(request.user_id, request.GET.get('cursor'), page_size)
+        except CustomValidationError as e:
+            return json_response_errors(errors=e)
+        return json_response_ok({"results": friends, "next_cursor": next_cursor})
 
 
 class DeleteFriendView(APIView):
     def post(self, request):
         friend_id = request.data.get('friend_id')
         try:
-            FriendService.delete_friend(request.user_id, friend_id, request.token)
+            FriendService.delete_friend(request.user_id, friend_id)
             return response_ok()
         except CustomValidationError as e:
             return response_errors(errors=e)
@@ -83,7 +106,7 @@ class BlockFriendView(APIView):
         if not friend_id:
             return response_errors(errors=CustomValidationError(ErrorType.FIELD_REQUIRED))
         try:
-            FriendService.block_friend(request.user_id, friend_id, request.token)
+            FriendService.block_friend(request.user_id, friend_id)
             return response_ok()
         except CustomValidationError as e:
             return response_errors(errors=e)
@@ -98,4 +121,58 @@ class UnblockFriendView(APIView):
             FriendService.unblock_friend(request.user_id, friend_id)
             return response_ok()
         except CustomValidationError as e:
-            return response_errors(errors=e)
\ No newline at end of file
+            return response_errors(errors=e)
+
+
+class BulkBlockView(APIView):
+    def post(self, request):
+        serializer = BulkUserIdsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return response_errors(serializer.errors)
+        try:
+            blocked = FriendService.block_users(request.user_id, serializer.validated_data['user_ids'])
+            return response_ok({"blocked": blocked})
+        except CustomValidationError as e:
+            return response_errors(errors=e)
+
+
+class BulkUnblockView(APIView):
+    def post(self, request):
+        serializer = BulkUserIdsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return response_errors(serializer.errors)
+        try:
+            unblocked = FriendService.unblock_users(request.user_id, serializer.validated_data['user_ids'])
+            return response_ok({"unblocked": unblocked})
+        except CustomValidationError as e:
+            return response_errors(errors=e)
+
+
+# 채팅, 매치메이킹 서비스가 메시지마다 호출하는 내부 API
+# JWT 대신 공유 토큰으로 인증하고 DB를 조회하지 않음
+@method_decorator(csrf_exempt, name='dispatch')
+class BlockCheckView(View):
+    async def post(self, request):
+        if not has_internal_token(request):
+            return json_response_errors(errors=CustomValidationError(ErrorType.INVALID_INTERNAL_TOKEN))
+
+        try:
+            pairs = parse_block_pairs(json.loads(request.body or b'{}').get('pairs'))
+            results = await BlockCacheService.check_pairs(pairs)
+        except (ValueError, AttributeError):
+            return json_response_errors(errors=CustomValidationError(ErrorType.VALIDATION_ERROR))
+        except CustomValidationError as e:
+            return json_response_errors(errors=e)
+        return json_response_ok({"results": results})
+
+
+# [[blocker_id, blocked_id], ...] 형식 검사
+def parse_block_pairs(pairs):
+    if not isinstance(pairs, list) or not 0 < len(pairs) <= settings.BLOCK_CHECK_MAX_PAIRS:
+        raise ValueError("pairs")
+    parsed = []
+    for pair in pairs:
+        if not isinstance(pair, list) or len(pair) != 2 or not all(type(user_id) is int for user_id in pair):
+            raise ValueError("pairs")
+        parsed.append((pair[0], pair[1]))
+    return parsed
@@ -1,8 +1,12 @@
+import asyncio
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
+from config.json_encoding import dumps, encode_event
+from friend.services import PresenceService
 from .redis_utils import (
-    add_user_to_online_users,
-    remove_user_from_online_users,
+    add_presence,
+    refresh_presence,
+    remove_presence,
 )
 
 class NotificationConsumer(AsyncWebsocketConsumer):
@@ -13,30 +17,47 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
         
-        # Redis에 사용자 추가
+        # 접속 상태 기록(사용자별로 여러 연결 유지)과 그룹 가입을 동시에 처리
         self.group_name = f'notification_{self.user_id}'
-        await add_user_to_online_users(self.user_id, self.channel_name)
-        
-        # 그룹에 WebSocket 연결 추가
-        await self.channel_layer.group_add(
-            self.group_name,
-            self.channel_name
+        connections, _ = await asyncio.gather(
+            add_presence(self.user_id, self.channel_name),
+            self.channel_layer.group_add(self.group_name, self.channel_name)
         )
         await self.accept()
+
+        # 첫 연결이면 친구들에게 접속 알림
+        if connections == 1:
+            PresenceService.schedule_announcement(self.user_id)
+
+        # 현재 접속 중인 친구 목록 전송, 이후 변화는 friend.presence 이벤트로 전달
+        online_friend_ids = await PresenceService.get_online_friend_ids(self.user_id)
+        await self.send_json({
+            "type": "presence.snapshot",
+            "content": {
+                "online_friends": online_friend_ids
+            }
+        })
     
     async def disconnect(self, close_code):
-        # Redis에서 사용자 제거
-        if self.user_id:
-            await remove_user_from_online_users(self.user_id)
-        
-        # 그룹에서 WebSocket 연결 제거
-        await self.channel_layer.group_discard(
-            self.group_name,
-            self.channel_name
+        if not self.user_id:
+            return
+
+        # 이 연결만 제거(다른 연결이 남아 있으면 온라인 유지)하고 그룹에서도 제거
+        remaining, _ = await asyncio.gather(
+            remove_presence(self.user_id, self.channel_name),
+            self.channel_layer.group_discard(self.group_name, self.channel_name)
         )
+        if remaining == 0:
+            PresenceService.schedule_announcement(self.user_id)
 
-    async def receive(self, text_data):
-        pass
+    # 클라이언트는 PRESENCE_TTL보다 짧은 주기로 {"type": "heartbeat"}를 전송
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            message = json.loads(text_data or '')
+        except ValueError:
+            return
+        if isinstance(message, dict) and message.get('type') == 'heartbeat':
+            await refresh_presence(self.user_id, self.channel_name)
             
     async def reception_invitation(self, event):
         await self.send_json(event)
@@ -50,6 +71,9 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     async def friend_request(self, event):
         await self.send_json(event)
 
+    async def friend_presence(self, event):
+        await self.send_json(event)
+
     # 메시지를 그룹에 브로드캐스트
     async def broadcast_message(self, notification_type, content):
         await self.channel_layer.group_send(
@@ -63,15 +87,15 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
     # 메시지를 WebSocket 클라이언트에 전송
     async def send_to_client(self, event):
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=dumps({
             'notification_type': event['notification_type'],
             'content': event['content']
         }))
         
     async def send_json(self, message):
         try:
-            json_message = json.dumps(message)
+            json_message = encode_event(message)
             await self.send(text_data=json_message)
         except (TypeError, ValueError) as e:
             error_message = {"type": "error", "message":"Invalid json format."}
-            await self.send(text_data=json.dumps(error_message))
\ No newline at end of file
+            await self.send(text_data=dumps(error_message))
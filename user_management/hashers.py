@@ -0,0 +1,37 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, make_password
+
+# 비밀번호 해시는 CPU를 많이 쓰므로 크기가 제한된 풀에서만 실행
+# (hashlib의 PBKDF2/scrypt와 argon2-cffi는 계산 중 GIL을 놓으므로 스레드로도 코어를 나눠 씀)
+# 로그인이 몰려도 동시에 해시하는 요청은 PASSWORD_HASHING_WORKERS개로 제한되고 나머지는 대기
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    thread_name_prefix='password-hashing'
+)
+
+
+# PASSWORD_PBKDF2_ITERATIONS로 반복 횟수를 조정하는 PBKDF2
+# 알고리즘 이름이 같아 기존 해시도 검증하고, 반복 횟수가 다르면 로그인 시 재해시됨
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+def _verify(password, encoded):
+    needs_rehash = []
+    is_valid = check_password(password, encoded, setter=lambda raw_password: needs_rehash.append(True))
+    return is_valid, bool(needs_rehash)
+
+# (일치 여부, 기본 hasher로 재해시가 필요한지) 반환
+async def averify_password(password, encoded):
+    return await asyncio.get_running_loop().run_in_executor(_executor, partial(_verify, password, encoded))
+
+async def ahash_password(password):
+    return await asyncio.get_running_loop().run_in_executor(_executor, partial(make_password, password))
+
+# 동기 경로(create_user, 관리 커맨드 등)용: 동시 해시 수만 제한하고 호출 스레드는 해시가 끝날 때까지 대기
+# 요청 처리 중에는 ahash_password를 사용
+def hash_password(password):
+    return _executor.submit(make_password, password).result()
@@ -0,0 +1,52 @@
+import asyncio
+import os
+import time
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from user_management.models import User
+from user_management.services import AuthService
+
+BENCH_EMAIL = 'bench_login@bench.local'
+BENCH_PASSWORD = 'bench-Password-123'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure login throughput through the bounded password-hashing pool and report logins per second "
+        "per core. Run it against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if not User.objects.filter(email=BENCH_EMAIL).exists():
+            User.objects.create_user(email=BENCH_EMAIL, nickname='bench_login', password=BENCH_PASSWORD)
+
+        hasher = get_hasher()
+        encoded = User.objects.get(email=BENCH_EMAIL).password
+        start = time.perf_counter()
+        hasher.verify(BENCH_PASSWORD, encoded)
+        single = (time.perf_counter() - start) * 1000
+
+        elapsed = asyncio.run(self.storm(options['logins'], options['concurrency']))
+        rate = options['logins'] / elapsed
+        cores = min(settings.PASSWORD_HASHING_WORKERS, os.cpu_count() or 1)
+
+        self.stdout.write(f"hasher: {hasher.algorithm} (workers={settings.PASSWORD_HASHING_WORKERS}, cores={os.cpu_count()})")
+        self.stdout.write(f"single verify:  {single:8.2f} ms")
+        self.stdout.write(f"logins:         {options['logins']} with concurrency {options['concurrency']} in {elapsed:.2f}s")
+        self.stdout.write(f"throughput:     {rate:8.1f} logins/s ({rate / cores:.1f} logins/s per core)")
+
+    async def storm(self, logins, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def login():
+            async with semaphore:
+                await AuthService.authenticate_user(BENCH_EMAIL, BENCH_PASSWORD)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        return time.perf_counter() - start
@@ -0,0 +1,60 @@
+import time
+import jwt
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponse
+from django.test import RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+from config.middleware import CustomHttpMiddleware, token_claims_cache
+from user_management.models import User
+
+
+class Command(BaseCommand):
+    help = "Measure CustomHttpMiddleware overhead per request with and without the JWT claims cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000)
+        parser.add_argument(
+            '--budget-us', type=float,
+            help="Fail if the excluded or cache-hit path costs more than this many microseconds per request."
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        token = str(AccessToken.for_user(User(id=1)))
+        factory = RequestFactory()
+        request = factory.get('/api/user/profile/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        excluded_request = factory.get('/api/user/login/')
+        middleware = CustomHttpMiddleware(lambda request: HttpResponse())
+
+        # 변경 전: 서명 검증 없이 매 요청 디코딩
+        unverified = self.measure(iterations, lambda: jwt.decode(token, options={"verify_signature": False}))
+
+        # 캐시 없이 매 요청 서명 검증
+        def verify_without_cache():
+            token_claims_cache.clear()
+            middleware.process_request(request)
+        cold = self.measure(iterations, verify_without_cache)
+
+        # 같은 세션의 반복 요청 (캐시 적중)
+        token_claims_cache.clear()
+        warm = self.measure(iterations, lambda: middleware.process_request(request))
+
+        # 인증 제외 경로
+        excluded = self.measure(iterations, lambda: middleware.process_request(excluded_request))
+
+        self.stdout.write(f"iterations: {iterations}")
+        self.stdout.write(f"before (unverified decode):   {unverified:8.2f} us/request")
+        self.stdout.write(f"verified, cache miss:         {cold:8.2f} us/request")
+        self.stdout.write(f"verified, cache hit:          {warm:8.2f} us/request")
+        self.stdout.write(f"excluded path:                {excluded:8.2f} us/request")
+
+        # 요청당 미들웨어 비용 회귀 감시 (CI의 전용 벤치마크 단계 등에서 사용)
+        budget = options['budget_us']
+        if budget is not None and max(warm, excluded) > budget:
+            raise CommandError(f"middleware cost exceeds the budget of {budget} us/request")
+
+    def measure(self, iterations, func):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) / iterations * 1_000_000
@@ -0,0 +1,83 @@
+import asyncio
+import statistics
+import time
+from channels.layers import get_channel_layer
+from django.core.management.base import BaseCommand
+from user_management.redis_utils import redis_client, add_presence, remove_presence, ONLINE_USERS_KEY
+
+# 실제 사용자와 겹치지 않는 id 대역
+BENCH_USER_ID_OFFSET = 10 ** 9
+LEGACY_USER_CHANNELS_KEY = 'bench_user_channels'
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate a reconnect storm against Redis and report connect/disconnect latency "
+        "of the presence writes. Run it against a scratch Redis."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=10_000)
+        parser.add_argument('--concurrency', type=int, default=1_000)
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options['clients'], options['concurrency']))
+
+    async def run(self, clients, concurrency):
+        channel_layer = get_channel_layer()
+        # 변경 전: SADD, HSET, group_add를 차례로 await
+        async def legacy_connect(user_id, channel_name):
+            await redis_client.sadd(ONLINE_USERS_KEY, user_id)
+            await redis_client.hset(LEGACY_USER_CHANNELS_KEY, user_id, channel_name)
+            await channel_layer.group_add(f'notification_{user_id}', channel_name)
+
+        async def legacy_disconnect(user_id, channel_name):
+            await redis_client.srem(ONLINE_USERS_KEY, user_id)
+            await redis_client.hdel(LEGACY_USER_CHANNELS_KEY, user_id)
+            await channel_layer.group_discard(f'notification_{user_id}', channel_name)
+
+        # 현재: 스크립트 한 번과 group_add를 동시에
+        async def connect(user_id, channel_name):
+            await asyncio.gather(
+                add_presence(user_id, channel_name),
+                channel_layer.group_add(f'notification_{user_id}', channel_name)
+            )
+
+        async def disconnect(user_id, channel_name):
+            await asyncio.gather(
+                remove_presence(user_id, channel_name),
+                channel_layer.group_discard(f'notification_{user_id}', channel_name)
+            )
+
+        self.stdout.write(f"clients={clients} concurrency={concurrency}")
+        for name, on_connect, on_disconnect in (
+            ("before (sequential commands)", legacy_connect, legacy_disconnect),
+            ("after (script + concurrent group_add)", connect, disconnect),
+        ):
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            channel_names = [await channel_layer.new_channel() for _ in range(clients)]
+            await self.storm("connect", clients, concurrency, on_connect, channel_names)
+            await self.storm("disconnect", clients, concurrency, on_disconnect, channel_names)
+        await redis_client.unlink(LEGACY_USER_CHANNELS_KEY)
+
+    async def storm(self, label, clients, concurrency, operation, channel_names):
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def run_one(index):
+            async with semaphore:
+                start = time.perf_counter()
+                await operation(BENCH_USER_ID_OFFSET + index, channel_names[index])
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run_one(index) for index in range(clients)))
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        self.stdout.write(
+            f"  {label:<10} total={elapsed:.2f}s ({clients / elapsed:.0f}/s) "
+            f"p50={statistics.median(latencies):.2f}ms "
+            f"p95={latencies[int(len(latencies) * 0.95) - 1]:.2f}ms "
+            f"p99={latencies[int(len(latencies) * 0.99) - 1]:.2f}ms"
+        )
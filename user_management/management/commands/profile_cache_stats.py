@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from user_management.services import ProfileCacheService
+
+
+class Command(BaseCommand):
+    help = "Report profile cache hit and miss counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Reset the counters after reporting them.")
+
+    def handle(self, *args, **options):
+        stats = ProfileCacheService.get_stats()
+        total = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / total * 100 if total else 0
+        self.stdout.write(f"hits: {stats['hits']}, misses: {stats['misses']}, hit rate: {hit_rate:.1f}%")
+        if options['reset']:
+            ProfileCacheService.reset_stats()
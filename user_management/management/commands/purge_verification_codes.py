@@ -0,0 +1,37 @@
+import time
+from django.core.management.base import BaseCommand
+from user_management.services import DatabaseVerificationCodeStore
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete used and expired EmailVerificationCode rows in bounded batches. "
+        "Sleeps between batches so it can run from cron without long locks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0.1, help="Seconds to sleep between batches.")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        deleting = 0.0
+        total = batches = 0
+
+        batch_start = time.perf_counter()
+        for deleted in DatabaseVerificationCodeStore.purge_expired(options['batch_size']):
+            deleting += time.perf_counter() - batch_start
+            total += deleted
+            batches += 1
+            if options['verbosity'] >= 2:
+                self.stdout.write(f"batch {batches}: deleted {deleted} rows")
+            if options['sleep']:
+                time.sleep(options['sleep'])
+            batch_start = time.perf_counter()
+
+        elapsed = time.perf_counter() - start
+        rate = total / deleting if deleting else 0
+        self.stdout.write(
+            f"deleted {total} verification codes in {batches} batches, {elapsed:.1f}s "
+            f"({rate:.0f} rows/s while deleting)"
+        )
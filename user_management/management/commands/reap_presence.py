@@ -0,0 +1,50 @@
+import asyncio
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from friend.services import PresenceService
+from user_management.redis_utils import scan_online_users, reap_presence, delete_legacy_user_channels
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove expired presence entries left behind by crashed workers. "
+        "Walks online_users with SSCAN in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.PRESENCE_REAPER_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=settings.PRESENCE_REAPER_INTERVAL)
+        parser.add_argument('--once', action='store_true', help="Run a single pass and exit.")
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options['batch_size'], options['interval'], options['once']))
+
+    async def run(self, batch_size, interval, once):
+        await delete_legacy_user_channels()
+        while True:
+            offline, reaped = await self.reap(batch_size)
+            if reaped or offline:
+                self.stdout.write(f"reaped {reaped} expired connections, {offline} users went offline")
+            if once:
+                return
+            await asyncio.sleep(interval)
+
+    async def reap(self, batch_size):
+        channel_layer = get_channel_layer()
+        cursor = 0
+        total_offline = total_reaped = 0
+        while True:
+            cursor, user_ids = await scan_online_users(cursor, batch_size)
+            offline_user_ids, reaped = await reap_presence(user_ids)
+            # 죽은 연결이 notification 그룹 메시지를 계속 받지 않도록 제거
+            for user_id, channel_name in reaped:
+                await channel_layer.group_discard(f'notification_{user_id}', channel_name)
+            # 종료 이벤트 없이 사라진 사용자도 친구들에게 오프라인 알림
+            await asyncio.gather(*(
+                PresenceService.announce(user_id, is_online=False) for user_id in offline_user_ids
+            ))
+            total_offline += len(offline_user_ids)
+            total_reaped += len(reaped)
+            if cursor == 0:
+                return total_offline, total_reaped
@@ -0,0 +1,54 @@
+import time
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from user_management.services import MailService
+
+
+class Command(BaseCommand):
+    help = (
+        "Send emails from the QueuedEmail table. Connects to the mail server only when there is work, "
+        "keeps the connection open while batches keep coming and retries failed messages with exponential backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_QUEUE_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=settings.EMAIL_QUEUE_POLL_INTERVAL)
+        parser.add_argument('--once', action='store_true', help="Send due emails once and exit.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        mail_connection = get_connection()
+        is_open = False
+        try:
+            while True:
+                emails = MailService.claim_due_emails(batch_size)
+                if not emails:
+                    # 유휴 상태에서는 연결을 닫고, 다음 배치가 생길 때까지 다시 연결하지 않음
+                    if is_open:
+                        mail_connection.close()
+                        is_open = False
+                    if options['once']:
+                        return
+                    time.sleep(options['interval'])
+                    continue
+
+                if not is_open:
+                    try:
+                        mail_connection.open()
+                        is_open = True
+                    except Exception as e:
+                        self.stderr.write(f"failed to connect to the mail server: {e}")
+                        MailService.release_emails(emails)
+                        if options['once']:
+                            return
+                        time.sleep(options['interval'])
+                        continue
+
+                sent = MailService.send_emails(mail_connection, emails)
+                self.stdout.write(f"processed {sent} queued emails")
+                if options['once'] and sent < batch_size:
+                    return
+        finally:
+            if is_open:
+                mail_connection.close()
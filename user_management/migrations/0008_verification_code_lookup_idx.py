@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-19 05:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0007_queuedemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailverificationcode',
+            index=models.Index(fields=['email', 'is_used', 'created_at'], name='verification_code_lookup_idx'),
+        ),
+    ]
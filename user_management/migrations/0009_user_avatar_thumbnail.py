@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-19 05:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0008_verification_code_lookup_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar_thumbnail',
+            field=models.ImageField(blank=True, default='', upload_to='avatars/'),
+        ),
+    ]
@@ -1,19 +1,24 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
 from datetime import timedelta
+from .hashers import hash_password
 
 
 class UserManager(BaseUserManager):
     def create_user(self, email, password, **extra_fields):
-        if not email:
-            raise ValueError('The Email field must be set')
         if not password:
             raise ValueError('The Password field must be set')
+        return self.create_user_with_encoded_password(email, hash_password(password), **extra_fields)
+
+    # 해시 풀(ahash_password)에서 미리 계산한 해시로 생성 (async 회원가입 뷰에서 사용)
+    def create_user_with_encoded_password(self, email, encoded_password, **extra_fields):
+        if not email:
+            raise ValueError('The Email field must be set')
         
         email = self.normalize_email(email)
-        user = self.model(email=email, **extra_fields)
-        user.set_password(password)
+        user = self.model(email=email, password=encoded_password, **extra_fields)
         user.save(using=self._db)
         return user
 
@@ -28,6 +33,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     email = models.EmailField(unique=True)
     nickname = models.CharField(max_length=30, unique=True)
     avatar = models.ImageField(upload_to='avatars/', default='avatars/default.png')
+    # 친구 목록 등에 쓰는 작은 아바타 (비어 있으면 avatar 사용)
+    avatar_thumbnail = models.ImageField(upload_to='avatars/', blank=True, default='')
     is_staff = models.BooleanField(default=False)
     is_2fa_enabled = models.BooleanField(default=False)
     wins = models.PositiveIntegerField(default=0)
@@ -44,10 +51,41 @@ class EmailVerificationCode(models.Model):
     code = models.CharField(max_length=6)
     created_at = models.DateTimeField(auto_now_add=True)
     is_used = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # 인증 코드 조회와 이전 코드 만료 처리의 조건 (email, is_used, created_at 순서)
+            models.Index(fields=['email', 'is_used', 'created_at'], name='verification_code_lookup_idx'),
+        ]
     
     @property
     def is_expired(self):
         if self.is_used:
             return True
-        expiration_time = self.created_at + timedelta(minutes=5)  # 생성 후 5분 뒤 만료
-        return timezone.now() > expiration_time
\ No newline at end of file
+        expiration_time = self.created_at + timedelta(seconds=settings.VERIFICATION_CODE_TTL)  # 생성 후 5분 뒤 만료
+        return timezone.now() > expiration_time
+
+# 요청 스레드에서 SMTP를 기다리지 않도록 메일을 저장해 두고 send_queued_emails 워커가 전송
+class QueuedEmail(models.Model):
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(
+        max_length=10,
+        choices=[
+            ('pending', 'Pending'),
+            ('sent', 'Sent'),
+            ('failed', 'Failed'),
+        ],
+        default='pending'
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='queued_email_due_idx'),
+        ]
@@ -1,20 +1,220 @@
+import math
 import redis.asyncio as redis
+from redis import Redis as SyncRedis
 from django.conf import settings
 
 redis_client = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB)
+# 동기 코드(트랜잭션 on_commit, 관리 명령)에서 사용하는 클라이언트
+sync_redis_client = SyncRedis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB)
 
 ONLINE_USERS_KEY = 'online_users'
-USER_CHANNELS_KEY = 'user_channels'
-
-async def add_user_to_online_users(user_id, channel_name):
-    await redis_client.sadd(ONLINE_USERS_KEY, user_id)
-    await redis_client.hset(USER_CHANNELS_KEY, user_id, channel_name)
-    
-async def get_channel_name(user_id):
-    channel_name = await redis_client.hget(USER_CHANNELS_KEY, user_id)
-    if channel_name:
-        return channel_name.decode("utf-8")
-
-async def remove_user_from_online_users(user_id):
-    await redis_client.srem(ONLINE_USERS_KEY, user_id)
-    await redis_client.hdel(USER_CHANNELS_KEY, user_id)
\ No newline at end of file
+PRESENCE_KEY = 'presence:{}'
+PRESENCE_STATE_KEY = 'presence_state:{}'
+LEGACY_USER_CHANNELS_KEY = 'user_channels'
+BLOCKS_KEY = 'blocks:{}'
+VERIFICATION_CODE_KEY = 'verification_code:{}'
+
+# 접속 상태: 사용자별 sorted set(presence:{user_id})에 연결(channel name)마다 만료 시각을 score로 저장
+# 탭을 여러 개 열어도 연결 하나가 끊길 때 다른 연결이 남아 있으면 온라인 상태 유지
+# online_users에는 살아 있는 연결이 하나 이상인 사용자 id를 보관
+# 시각은 워커 간 시계 차이가 없도록 Redis TIME 기준
+
+# 만료된 연결은 여기서 지우지 않음: REAP_PRESENCE_SCRIPT만 지우고 그 채널을 그룹에서 제거(group_discard)함
+# KEYS[1]=presence:{user_id}, KEYS[2]=online_users
+# ARGV[1]=user_id, ARGV[2]=channel_name, ARGV[3]=연결 ttl, ARGV[4]=키 ttl / 만료되지 않은 연결 수 반환
+TOUCH_PRESENCE_SCRIPT = redis_client.register_script("""
+local now = tonumber(redis.call('TIME')[1])
+local ttl = tonumber(ARGV[3])
+redis.call('ZADD', KEYS[1], now + ttl, ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('SADD', KEYS[2], ARGV[1])
+return redis.call('ZCOUNT', KEYS[1], '(' .. now, '+inf')
+""")
+
+# 연결을 제거하고 만료되지 않은 연결 수 반환
+# 만료된 연결이 남아 있으면 reaper가 찾을 수 있도록 online_users에서 빼지 않음
+REMOVE_PRESENCE_SCRIPT = redis_client.register_script("""
+local now = tonumber(redis.call('TIME')[1])
+redis.call('ZREM', KEYS[1], ARGV[2])
+if redis.call('ZCARD', KEYS[1]) == 0 then
+    redis.call('SREM', KEYS[2], ARGV[1])
+end
+return redis.call('ZCOUNT', KEYS[1], '(' .. now, '+inf')
+""")
+
+# KEYS = presence 키 목록, 각 사용자의 만료되지 않은 연결 수 반환
+ONLINE_STATUS_SCRIPT = redis_client.register_script("""
+local now = tonumber(redis.call('TIME')[1])
+local counts = {}
+for i, key in ipairs(KEYS) do
+    counts[i] = redis.call('ZCOUNT', key, '(' .. now, '+inf')
+end
+return counts
+""")
+
+# KEYS = presence 키 목록, 각 사용자의 모든 연결(channel name)과 만료되지 않은 연결 수 반환
+# heartbeat가 늦은 연결도 아직 소켓이 열려 있을 수 있으므로 전송 대상에서 빼지 않음
+PRESENCE_CHANNELS_SCRIPT = redis_client.register_script("""
+local now = tonumber(redis.call('TIME')[1])
+local result = {}
+for i, key in ipairs(KEYS) do
+    result[i] = {redis.call('ZRANGE', key, 0, -1), redis.call('ZCOUNT', key, '(' .. now, '+inf')}
+end
+return result
+""")
+
+# KEYS = presence 키 목록 + online_users / ARGV = 키 순서와 같은 user_id 목록
+# 만료된 연결을 제거하고 [{오프라인이 된 user_id, ...}, {user_id, channel_name, ...}] 반환
+REAP_PRESENCE_SCRIPT = redis_client.register_script("""
+local now = tonumber(redis.call('TIME')[1])
+local online_key = KEYS[#KEYS]
+local offline = {}
+local reaped = {}
+for i = 1, #KEYS - 1 do
+    local expired = redis.call('ZRANGEBYSCORE', KEYS[i], '-inf', now)
+    if #expired > 0 then
+        redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', now)
+        for _, channel_name in ipairs(expired) do
+            table.insert(reaped, ARGV[i])
+            table.insert(reaped, channel_name)
+        end
+    end
+    if redis.call('ZCARD', KEYS[i]) == 0 then
+        redis.call('SREM', online_key, ARGV[i])
+        table.insert(offline, ARGV[i])
+    end
+end
+return {offline, reaped}
+""")
+
+# 연결 추가와 heartbeat 갱신 모두 만료 시각을 새로 씀
+# 키 자체는 reaper 주기만큼 더 남겨 두어, 워커가 죽어도 reaper가 만료된 연결을 찾아 그룹에서 제거할 수 있게 함
+async def add_presence(user_id, channel_name):
+    key_ttl = settings.PRESENCE_TTL + math.ceil(settings.PRESENCE_REAPER_INTERVAL) * 2
+    return await TOUCH_PRESENCE_SCRIPT(
+        keys=[PRESENCE_KEY.format(user_id), ONLINE_USERS_KEY],
+        args=[user_id, channel_name, settings.PRESENCE_TTL, key_ttl]
+    )
+
+async def refresh_presence(user_id, channel_name):
+    return await add_presence(user_id, channel_name)
+
+async def remove_presence(user_id, channel_name):
+    return await REMOVE_PRESENCE_SCRIPT(
+        keys=[PRESENCE_KEY.format(user_id), ONLINE_USERS_KEY],
+        args=[user_id, channel_name]
+    )
+
+# 여러 사용자의 접속 여부를 한 번의 스크립트 실행으로 조회
+async def get_online_status(user_ids):
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    counts = await ONLINE_STATUS_SCRIPT(keys=[PRESENCE_KEY.format(user_id) for user_id in user_ids])
+    return {user_id: count > 0 for user_id, count in zip(user_ids, counts)}
+
+# 여러 사용자의 연결 목록과 접속 여부를 한 번의 스크립트 실행으로 조회
+# {user_id: ([channel_name, ...], is_online)}
+async def get_presence_channels(user_ids):
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    result = await PRESENCE_CHANNELS_SCRIPT(keys=[PRESENCE_KEY.format(user_id) for user_id in user_ids])
+    return {
+        user_id: ([channel_name.decode("utf-8") for channel_name in channel_names], live_count > 0)
+        for user_id, (channel_names, live_count) in zip(user_ids, result)
+    }
+
+async def is_user_online(user_id):
+    return (await get_online_status([user_id]))[user_id]
+
+# online_users를 SSCAN으로 나눠 순회 (cursor가 0이면 순회 완료)
+async def scan_online_users(cursor, batch_size):
+    cursor, user_ids = await redis_client.sscan(ONLINE_USERS_KEY, cursor, count=batch_size)
+    return cursor, [user_id.decode("utf-8") for user_id in user_ids]
+
+# 워커가 비정상 종료되어 disconnect가 실행되지 않은 연결 정리
+async def reap_presence(user_ids):
+    if not user_ids:
+        return [], []
+    offline, reaped = await REAP_PRESENCE_SCRIPT(
+        keys=[PRESENCE_KEY.format(user_id) for user_id in user_ids] + [ONLINE_USERS_KEY],
+        args=user_ids
+    )
+    reaped = [value.decode("utf-8") for value in reaped]
+    return [int(user_id) for user_id in offline], list(zip(reaped[0::2], reaped[1::2]))
+
+# 친구들에게 마지막으로 알린 접속 상태를 바꾸고 이전 값 반환 (SET ... GET)
+async def swap_presence_state(user_id, is_online):
+    previous = await redis_client.set(
+        PRESENCE_STATE_KEY.format(user_id),
+        int(is_online),
+        ex=settings.PRESENCE_STATE_TIMEOUT,
+        get=True
+    )
+    if previous is not None:
+        return previous == b'1'
+
+# 연결마다 한 칸을 쓰던 이전 구조의 해시 (더 이상 쓰지 않음)
+async def delete_legacy_user_channels():
+    return await redis_client.unlink(LEGACY_USER_CHANNELS_KEY)
+
+
+# blocks:{blocker_id} 집합에 차단한 사용자 id를 보관
+def add_blocks(blocker_id, blocked_ids):
+    if blocked_ids:
+        sync_redis_client.sadd(BLOCKS_KEY.format(blocker_id), *blocked_ids)
+
+def remove_blocks(blocker_id, blocked_ids):
+    if blocked_ids:
+        sync_redis_client.srem(BLOCKS_KEY.format(blocker_id), *blocked_ids)
+
+# (blocker_id, blocked_id) 쌍들의 차단 여부를 한 번의 왕복으로 확인
+async def check_blocks(pairs):
+    if not pairs:
+        return []
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for blocker_id, blocked_id in pairs:
+            pipe.sismember(BLOCKS_KEY.format(blocker_id), blocked_id)
+        return [bool(result) for result in await pipe.execute()]
+
+def scan_block_keys(batch_size):
+    return set(sync_redis_client.scan_iter(match=BLOCKS_KEY.format('*'), count=batch_size))
+
+# 사용자별 차단 집합을 통째로 교체 (읽는 쪽에서 빈 집합이 보이지 않도록 MULTI로 처리)
+def replace_block_sets(block_sets):
+    with sync_redis_client.pipeline(transaction=True) as pipe:
+        for blocker_id, blocked_ids in block_sets.items():
+            key = BLOCKS_KEY.format(blocker_id)
+            pipe.delete(key)
+            pipe.sadd(key, *blocked_ids)
+        pipe.execute()
+
+def delete_keys(keys):
+    if keys:
+        sync_redis_client.delete(*keys)
+
+
+# 이메일 인증 코드, 만료는 Redis TTL에 맡김
+def store_verification_code(email, code, ttl):
+    sync_redis_client.set(VERIFICATION_CODE_KEY.format(email), code, ex=ttl)
+
+# 코드가 일치할 때만 삭제해 한 번만 사용 가능 (틀린 코드로는 지워지지 않음)
+CONSUME_VERIFICATION_CODE_SCRIPT = sync_redis_client.register_script("""
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+return 0
+""")
+
+def consume_verification_code(email, code):
+    return bool(CONSUME_VERIFICATION_CODE_SCRIPT(keys=[VERIFICATION_CODE_KEY.format(email)], args=[code]))
+
+
+# 카운터: INCR은 키가 없으면 0에서 시작하므로 한 번의 왕복으로 원자적으로 증가
+def incr_counter(key):
+    sync_redis_client.incr(key)
+
+def get_counters(keys):
+    return {key: int(value or 0) for key, value in zip(keys, sync_redis_client.mget(keys))}
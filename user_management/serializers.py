@@ -1,9 +1,11 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from config.custom_validation_error import CustomValidationError
 from django.contrib.auth.password_validation import validate_password
 from .models import User
 from config.error_type import ErrorType
-from .services import AuthService
+from .services import AuthService, AvatarService
 
 
 class NicknameCheckSerializer(serializers.Serializer):
@@ -34,25 +36,34 @@ class UserRegisterSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True, validators=[validate_password])
     code = serializers.CharField(max_length=6)
 
-    def validate(self, attrs):
-        email = attrs.get('email')
-        code = attrs.get('code')
-        
-        verification_record = AuthService.verify_email_code(email, code)
+    def validate_email(self, value):
+        if User.objects.filter(email=value).exists():
+            raise CustomValidationError(ErrorType.EMAIL_ALREADY_EXISTS)
+        return value
 
-        attrs['verification_record'] = verification_record
-        return attrs
+    def validate_nickname(self, value):
+        if User.objects.filter(nickname=value).exists():
+            raise CustomValidationError(ErrorType.NICKNAME_ALREADY_EXISTS)
+        return value
 
+    # encoded_password: 뷰에서 ahash_password로 미리 계산한 해시 (save(encoded_password=...))
+    # 인증 코드는 사용자 생성에 성공한 뒤 같은 트랜잭션에서 사용 처리 (가입이 실패하면 코드가 남아 있음)
     def create(self, validated_data):
-        user = User.objects.create_user(
-            email=validated_data['email'],
-            nickname=validated_data['nickname'],
-            password=validated_data['password']
-        )
-        
-        verification_record = self.validated_data['verification_record']
-        verification_record.is_used = True
-        verification_record.save()
+        email = validated_data['email']
+        nickname = validated_data['nickname']
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user_with_encoded_password(
+                    email=email,
+                    nickname=nickname,
+                    encoded_password=validated_data['encoded_password']
+                )
+                AuthService.verify_email_code(email, validated_data['code'])
+        except IntegrityError:
+            # 검증과 생성 사이에 같은 이메일/닉네임으로 먼저 가입한 경우
+            if User.objects.filter(email=email).exists():
+                raise CustomValidationError(ErrorType.EMAIL_ALREADY_EXISTS)
+            raise CustomValidationError(ErrorType.NICKNAME_ALREADY_EXISTS)
         return user
 
 
@@ -86,7 +97,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
         instance.nickname = validated_data.get('nickname', instance.nickname)
         avatar_file = self.context['request'].FILES.get('avatar')
         if avatar_file:
-            instance.avatar = avatar_file
+            instance.avatar, instance.avatar_thumbnail = AvatarService.save_avatar(avatar_file)
         instance.save()
         return instance
         
@@ -99,11 +110,26 @@ class FriendSerializer(serializers.ModelSerializer):
 
 class UserWinLossSerializer(serializers.Serializer):
     is_win = serializers.BooleanField(required=True)
-    
-    def update(self, instance, validated_data):
-        if validated_data['is_win']:
-            instance.wins += 1
-        else:
-            instance.losses += 1
-        instance.save()
-        return instance
+
+
+class MatchResultSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField()
+    is_win = serializers.BooleanField(required=True)
+
+
+class UserWinLossBatchSerializer(serializers.Serializer):
+    results = MatchResultSerializer(many=True, allow_empty=False)
+
+
+# 내부 서비스가 NotificationConsumer로 보낼 수 있는 알림 종류 (consumer 핸들러 이름)
+FAN_OUT_NOTIFICATION_TYPES = ['reception_invitation', 'tournament_round_start', 'tournament_end']
+
+
+class NotificationFanOutSerializer(serializers.Serializer):
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.NOTIFICATION_FAN_OUT_MAX_USERS
+    )
+    type = serializers.ChoiceField(choices=FAN_OUT_NOTIFICATION_TYPES)
+    content = serializers.JSONField(required=False, default=dict)
@@ -1,54 +1,283 @@
+import asyncio
+import hashlib
+from datetime import timedelta
+from io import BytesIO
+from channels.layers import get_channel_layer
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from redis.exceptions import RedisError
+from PIL import Image, ImageOps, UnidentifiedImageError
+import logging
 import random
 import string
-from .models import EmailVerificationCode
+from .models import EmailVerificationCode, QueuedEmail
+from .hashers import averify_password, ahash_password
+from .redis_utils import (
+    get_presence_channels, store_verification_code, consume_verification_code, incr_counter, get_counters, delete_keys
+)
 from config.custom_validation_error import CustomValidationError
+from config.json_encoding import with_encoded
 from config.error_type import ErrorType
 from rest_framework_simplejwt.tokens import RefreshToken
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 class UserService:
     @staticmethod
     async def get_user_name(user_id):
         user = await User.objects.aget(id=user_id)
         return user.nickname
-    
-    
+
+    @staticmethod
+    def record_match_result(user_id, is_win):
+        return UserService.record_match_results([(user_id, is_win)])[user_id]
+
+    # 경기 결과를 사용자별로 합산해 UPDATE ... RETURNING 한 번으로 반영 (행 잠금 없음)
+    # 여러 사용자를 갱신할 때는 호출자가 트랜잭션으로 묶으며, 없는 사용자가 있으면 USER_NOT_FOUND
+    @staticmethod
+    def record_match_results(results):
+        totals = {}
+        for user_id, is_win in results:
+            wins, losses = totals.get(user_id, (0, 0))
+            totals[user_id] = (wins + 1, losses) if is_win else (wins, losses + 1)
+
+        quote_name = connection.ops.quote_name
+        table = quote_name(User._meta.db_table)
+        wins_column = quote_name(User._meta.get_field('wins').column)
+        losses_column = quote_name(User._meta.get_field('losses').column)
+        nickname_column = quote_name(User._meta.get_field('nickname').column)
+        id_column = quote_name(User._meta.pk.column)
+
+        records = {}
+        with connection.cursor() as cursor:
+            # 동시 배치 간 교착을 피하기 위해 id 순서로 갱신
+            for user_id in sorted(totals):
+                wins, losses = totals[user_id]
+                # 변경되는 컬럼만 SET
+                assignments, params = [], []
+                for column, increment in ((wins_column, wins), (losses_column, losses)):
+                    if increment:
+                        assignments.append(f"{column} = {column} + %s")
+                        params.append(increment)
+                cursor.execute(
+                    f"UPDATE {table} SET {', '.join(assignments)} WHERE {id_column} = %s "
+                    f"RETURNING {wins_column}, {losses_column}, {nickname_column}",
+                    params + [user_id]
+                )
+                row = cursor.fetchone()
+                if row is None:
+                    raise CustomValidationError(ErrorType.USER_NOT_FOUND)
+                records[user_id] = {"wins": row[0], "losses": row[1]}
+                transaction.on_commit(
+                    lambda user_id=user_id, nickname=row[2]: ProfileCacheService.invalidate(user_id, nickname)
+                )
+        return records
+
+
+# 직렬화된 프로필을 Redis에 저장하는 write-through 캐시
+# Redis 장애 시에는 캐시를 건너뛰고 DB에서 조회
+class ProfileCacheService:
+    ID_KEY = 'profile:id:{}'
+    NICKNAME_KEY = 'profile:nickname:{}'
+    HITS_KEY = 'profile_cache:hits'
+    MISSES_KEY = 'profile_cache:misses'
+
+    @staticmethod
+    def get_by_id(user_id) -> dict:
+        return ProfileCacheService._get(
+            ProfileCacheService.ID_KEY.format(user_id),
+            lambda: User.objects.get(id=user_id)
+        )
+
+    @staticmethod
+    def get_by_nickname(nickname) -> dict:
+        return ProfileCacheService._get(
+            ProfileCacheService.NICKNAME_KEY.format(nickname),
+            lambda: User.objects.get(nickname=nickname)
+        )
+
+    @staticmethod
+    def set(user):
+        from .serializers import UserProfileSerializer
+        profile = dict(UserProfileSerializer(user).data)
+        try:
+            cache.set_many({
+                ProfileCacheService.ID_KEY.format(user.id): profile,
+                ProfileCacheService.NICKNAME_KEY.format(user.nickname): profile,
+            }, timeout=settings.PROFILE_CACHE_TIMEOUT)
+        except RedisError:
+            logger.warning("Failed to write profile cache for user %s", user.id, exc_info=True)
+        return profile
+
+    @staticmethod
+    def invalidate(user_id, *nicknames):
+        keys = [ProfileCacheService.ID_KEY.format(user_id)]
+        keys += [ProfileCacheService.NICKNAME_KEY.format(nickname) for nickname in nicknames if nickname]
+        try:
+            cache.delete_many(keys)
+        except RedisError:
+            logger.warning("Failed to invalidate profile cache for user %s", user_id, exc_info=True)
+
+    @staticmethod
+    def get_stats():
+        stats = get_counters([ProfileCacheService.HITS_KEY, ProfileCacheService.MISSES_KEY])
+        return {
+            "hits": stats[ProfileCacheService.HITS_KEY],
+            "misses": stats[ProfileCacheService.MISSES_KEY],
+        }
+
+    @staticmethod
+    def reset_stats():
+        delete_keys([ProfileCacheService.HITS_KEY, ProfileCacheService.MISSES_KEY])
+
+    @staticmethod
+    def _get(key, load_user):
+        profile = None
+        try:
+            profile = cache.get(key)
+        except RedisError:
+            logger.warning("Failed to read profile cache", exc_info=True)
+        ProfileCacheService._count(ProfileCacheService.HITS_KEY if profile is not None else ProfileCacheService.MISSES_KEY)
+        if profile is not None:
+            return profile
+        # 캐시 미스: DB에서 조회 후 캐시에 저장 (User.DoesNotExist는 호출자가 처리)
+        return ProfileCacheService.set(load_user())
+
+    # Django 캐시의 add/incr는 왕복이 여러 번이므로 Redis INCR 한 번으로 집계
+    @staticmethod
+    def _count(key):
+        try:
+            incr_counter(key)
+        except RedisError:
+            logger.warning("Failed to count profile cache access", exc_info=True)
+
+
+# 업로드된 아바타를 고정 크기 WebP로 변환해 원본 내용 해시 파일명으로 저장
+class AvatarService:
+    FILE_NAME = 'avatars/{}_{}.webp'
+
+    # (avatar, avatar_thumbnail) 저장 경로를 반환
+    @staticmethod
+    def save_avatar(upload):
+        digest = hashlib.sha256()
+        for chunk in upload.chunks():
+            digest.update(chunk)
+        content_hash = digest.hexdigest()
+
+        sizes = (settings.AVATAR_SIZE, settings.AVATAR_THUMBNAIL_SIZE)
+        names = [AvatarService.FILE_NAME.format(content_hash, size) for size in sizes]
+        # 같은 이미지가 이미 저장되어 있으면 디코딩 없이 재사용
+        if all(default_storage.exists(name) for name in names):
+            return tuple(names)
+
+        image = AvatarService._open(upload)
+        for name, size in zip(names, sizes):
+            if not default_storage.exists(name):
+                default_storage.save(name, ContentFile(AvatarService._encode(image, size)))
+        return tuple(names)
+
+    @staticmethod
+    def _open(upload):
+        try:
+            upload.seek(0)
+            # open은 헤더만 읽으므로 크기를 먼저 확인한 뒤 디코딩
+            image = Image.open(upload)
+            width, height = image.size
+            if width * height > settings.AVATAR_MAX_PIXELS:
+                raise CustomValidationError(ErrorType.INVALID_AVATAR_IMAGE)
+            # JPEG는 필요한 크기 이상인 가장 작은 배율(1/2, 1/4, 1/8)로 디코딩
+            if image.format == 'JPEG':
+                image.draft('RGB', (settings.AVATAR_SIZE, settings.AVATAR_SIZE))
+            image.load()
+        except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+            raise CustomValidationError(ErrorType.INVALID_AVATAR_IMAGE)
+        # EXIF 회전 정보를 픽셀에 반영 (EXIF 등 메타데이터는 다시 저장하지 않음)
+        image = ImageOps.exif_transpose(image)
+        return image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+    @staticmethod
+    def _encode(image, size):
+        resized = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        resized.save(buffer, format='WEBP', quality=settings.AVATAR_WEBP_QUALITY, method=6)
+        return buffer.getvalue()
+
+
+# NotificationConsumer로 보내는 알림
+class NotificationService:
+    # 수신자들의 연결을 한 번에 조회하고 한 번의 전송으로 모든 연결에 전달
+    # 접속 TTL은 delivered/offline 집계에만 쓰고, 전송은 heartbeat가 늦은 연결까지 포함
+    @staticmethod
+    async def fan_out(user_ids, event):
+        user_ids = list(dict.fromkeys(user_ids))
+        presence = await get_presence_channels(user_ids)
+        online_user_ids = [user_id for user_id in user_ids if presence[user_id][1]]
+
+        # 연결마다 다시 인코딩하지 않도록 클라이언트용 JSON을 한 번만 만들어 함께 전송
+        event = with_encoded(event)
+        channel_layer = get_channel_layer()
+        if "send_many" in getattr(channel_layer, "extensions", []):
+            await channel_layer.send_many(
+                [channel_name for user_id in user_ids for channel_name in presence[user_id][0]],
+                event
+            )
+        else:
+            await asyncio.gather(*(
+                channel_layer.group_send(f"notification_{user_id}", event)
+                for user_id in user_ids if presence[user_id][0]
+            ))
+        return {
+            "delivered": len(online_user_ids),
+            "offline": len(user_ids) - len(online_user_ids)
+        }
+
+
 class AuthService:
     @staticmethod
     def generate_verification_code(length=6):
         return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
     
+    # VERIFICATION_CODE_BACKEND: redis / database
     @staticmethod
-    def expire_previous_codes(email):
-        EmailVerificationCode.objects.filter(email=email, is_used=False).update(is_used=True)
-        
+    def get_verification_code_store():
+        return VERIFICATION_CODE_STORES[settings.VERIFICATION_CODE_BACKEND]
+
     @staticmethod
     def send_verification_code(email, code):
         subject = "Email Verification"
         message = f"Your verification code is: {code}"
-        MailService.custom_send_email(email, subject, message)
+        MailService.enqueue_email(email, subject, message)
         
     @staticmethod
     def process_email_verification_code(email):
-        AuthService.expire_previous_codes(email)
         code = AuthService.generate_verification_code()
-        EmailVerificationCode.objects.create(email=email, code=code)
+        AuthService.get_verification_code_store().issue(email, code)
         AuthService.send_verification_code(email, code)
     
+    # 해시 검증은 제한된 풀에서 실행해 이벤트 루프와 요청 스레드를 막지 않음
     @staticmethod
-    def authenticate_user(email, password) -> User:
+    async def authenticate_user(email, password) -> User:
         try:
-            user = User.objects.get(email=email)
+            user = await User.objects.aget(email=email)
         except User.DoesNotExist:
             raise CustomValidationError(ErrorType.INVALID_CREDENTIALS)
 
-        if not user.check_password(password):
+        is_valid, needs_rehash = await averify_password(password, user.password)
+        if not is_valid:
             raise CustomValidationError(ErrorType.INVALID_CREDENTIALS)
-        
+
+        # 이전 hasher나 반복 횟수로 저장된 해시는 현재 기본 hasher로 교체
+        if needs_rehash:
+            user.password = await ahash_password(password)
+            await User.objects.filter(id=user.id).aupdate(password=user.password)
         return user
     
     @staticmethod
@@ -79,24 +308,132 @@ class AuthService:
         AuthService.verify_email_code(email, code)
         return user
         
+    # 일치하는 코드를 사용 처리 (같은 코드로 두 번 인증할 수 없음)
     @staticmethod
     def verify_email_code(email, code):
+        AuthService.get_verification_code_store().consume(email, code)
+
+
+class RedisVerificationCodeStore:
+    # 같은 키에 덮어쓰므로 이전 코드는 자동으로 무효
+    @staticmethod
+    def issue(email, code):
+        store_verification_code(email, code, settings.VERIFICATION_CODE_TTL)
+
+    # 만료된 코드는 TTL로 이미 삭제되어 있으므로 잘못된 코드와 구분하지 않음
+    @staticmethod
+    def consume(email, code):
+        if not consume_verification_code(email, code):
+            raise CustomValidationError(ErrorType.INVALID_VERIFICATION_CODE)
+
+
+class DatabaseVerificationCodeStore:
+    @staticmethod
+    def issue(email, code):
+        EmailVerificationCode.objects.filter(email=email, is_used=False).update(is_used=True)
+        EmailVerificationCode.objects.create(email=email, code=code)
+
+    @staticmethod
+    def consume(email, code):
         try:
             verification_record = EmailVerificationCode.objects.filter(email=email, code=code, is_used=False).latest('created_at')
         except EmailVerificationCode.DoesNotExist:
             raise CustomValidationError(ErrorType.INVALID_VERIFICATION_CODE)
         if verification_record.is_expired:
             raise CustomValidationError(ErrorType.VERIFICATION_CODE_EXPIRED)
-        
-        return verification_record
+        # 동시에 같은 코드로 들어온 요청 중 하나만 성공
+        if not EmailVerificationCode.objects.filter(id=verification_record.id, is_used=False).update(is_used=True):
+            raise CustomValidationError(ErrorType.INVALID_VERIFICATION_CODE)
+
+    # 사용되었거나 만료된 코드를 id 순서로 batch_size개씩 삭제하고, 배치마다 삭제한 행 수를 반환
+    # 짧은 DELETE를 여러 번 실행해 긴 잠금을 피하고, 마지막 id부터 이어서 찾아 남겨 둔 행을 다시 읽지 않음
+    @staticmethod
+    def purge_expired(batch_size):
+        expired_before = timezone.now() - timedelta(seconds=settings.VERIFICATION_CODE_TTL)
+        expired = EmailVerificationCode.objects.filter(
+            Q(is_used=True) | Q(created_at__lt=expired_before)
+        ).order_by('id')
+        last_id = 0
+        while True:
+            ids = list(expired.filter(id__gt=last_id).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return
+            last_id = ids[-1]
+            yield EmailVerificationCode.objects.filter(id__in=ids).delete()[0]
+
+
+VERIFICATION_CODE_STORES = {
+    'redis': RedisVerificationCodeStore,
+    'database': DatabaseVerificationCodeStore,
+}
 
 
 class MailService:
     @staticmethod
-    def custom_send_email(email, subject, message):
+    def custom_send_email(email, subject, message, mail_connection=None):
         from_email = settings.DEFAULT_FROM_EMAIL
         recipient_list = [email]
-        send_mail(subject, message, from_email, recipient_list)
+        send_mail(subject, message, from_email, recipient_list, connection=mail_connection)
+
+    # 요청 처리 중에는 큐에만 저장하고 실제 전송은 send_queued_emails 워커가 처리
+    @staticmethod
+    def enqueue_email(email, subject, message):
+        return QueuedEmail.objects.create(to_email=email, subject=subject, body=message)
+
+    @staticmethod
+    def claim_due_emails(batch_size):
+        now = timezone.now()
+        with transaction.atomic():
+            emails = list(
+                QueuedEmail.objects.select_for_update(skip_locked=True).filter(
+                    status="pending",
+                    next_attempt_at__lte=now
+                ).order_by('id')[:batch_size]
+            )
+            QueuedEmail.objects.filter(id__in=[email.id for email in emails]).update(
+                next_attempt_at=now + timedelta(seconds=settings.EMAIL_QUEUE_LEASE_SECONDS)
+            )
+        return emails
+
+    # 연결 실패로 보내지 못한 배치는 리스 만료를 기다리지 않고 바로 다시 대기열에 올림
+    @staticmethod
+    def release_emails(emails):
+        QueuedEmail.objects.filter(id__in=[email.id for email in emails]).update(next_attempt_at=timezone.now())
+
+    # 워커가 열어 둔 SMTP 연결 하나로 배치 전체를 전송
+    @staticmethod
+    def send_emails(mail_connection, emails):
+        for email in emails:
+            try:
+                MailService.custom_send_email(email.to_email, email.subject, email.body, mail_connection=mail_connection)
+            except Exception as e:
+                MailService._mark_failed(email, e)
+                # 서버가 연결을 끊었을 수 있으므로 다시 연결
+                mail_connection.close()
+                try:
+                    mail_connection.open()
+                except Exception:
+                    logger.warning("Failed to reopen SMTP connection", exc_info=True)
+            else:
+                email.status = "sent"
+                email.sent_at = timezone.now()
+                email.save(update_fields=['status', 'sent_at'])
+        return len(emails)
+
+    @staticmethod
+    def _mark_failed(email, error):
+        email.attempts += 1
+        email.last_error = str(error)
+        if email.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+            email.status = "failed"
+        # 지수 백오프
+        delay = min(
+            settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (email.attempts - 1),
+            settings.EMAIL_QUEUE_MAX_RETRY_DELAY
+        )
+        email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+        logger.warning("Failed to send queued email %s (attempt %s)", email.id, email.attempts, exc_info=error)
         
     @staticmethod
     def validate_email_request(request):
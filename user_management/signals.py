@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .models import User
+from .services import ProfileCacheService
+
+
+# 사용자 삭제 시 프로필 캐시 제거
+@receiver(post_delete, sender=User)
+def invalidate_profile_cache(sender, instance, **kwargs):
+    ProfileCacheService.invalidate(instance.id, instance.nickname)
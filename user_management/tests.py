@@ -1,9 +1,30 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest.mock import patch, AsyncMock
+from asgiref.sync import async_to_sync
+from channels.testing import WebsocketCommunicator
+from django.core.management import call_command
 from django.urls import reverse
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
-from .models import User, EmailVerificationCode
+from .models import User, EmailVerificationCode, QueuedEmail
 from .serializers import UserProfileSerializer
+from .services import ProfileCacheService, NotificationService, MailService, AuthService
+from config.custom_validation_error import CustomValidationError
+from .consumers import NotificationConsumer
+from .redis_utils import add_presence
 from rest_framework_simplejwt.tokens import RefreshToken
+from PIL import Image
 
 
 class NicknameCheckTest(APITestCase):
@@ -29,6 +50,7 @@ class NicknameCheckTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
 
 
+@override_settings(VERIFICATION_CODE_BACKEND='database')
 class EmailCheckTest(APITestCase):
 
     def setUp(self):
@@ -45,6 +67,9 @@ class EmailCheckTest(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("Verification code sent", response.data["message"])
+        # 응답 전에 SMTP로 보내지 않고 큐에 저장
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(QueuedEmail.objects.get().to_email, 'newuser@example.com')
     
     def test_send_code_to_existing_email(self):
         data = {'email': self.existing_user.email}
@@ -53,6 +78,7 @@ class EmailCheckTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
 
 
+@override_settings(VERIFICATION_CODE_BACKEND='database')
 class UserRegisterTest(APITestCase):
     def setUp(self):
         self.url = reverse('register-complete')
@@ -80,6 +106,65 @@ class UserRegisterTest(APITestCase):
         user_exists = User.objects.filter(email=self.email).exists()
         self.assertTrue(user_exists)
 
+    @patch('user_management.models.hash_password')
+    def test_register_hashes_off_the_request_thread(self, mock_hash_password):
+        data = {
+            'email': self.email,
+            'nickname': self.nickname,
+            'password': self.password,
+            'code': self.code
+        }
+        response = self.client.post(self.url, data)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        mock_hash_password.assert_not_called()
+        self.assertTrue(User.objects.get(email=self.email).check_password(self.password))
+
+    def test_async_views_in_schema(self):
+        paths = self.client.get(reverse('schema'), {'format': 'json'}).json()['paths']
+        self.assertIn('post', paths[self.url])
+        self.assertIn('post', paths[reverse('login')])
+
+    def test_code_can_be_used_once(self):
+        data = {
+            'email': self.email,
+            'nickname': self.nickname,
+            'password': self.password,
+            'code': self.code
+        }
+        self.client.post(self.url, data)
+        response = self.client.post(self.url, {**data, 'email': 'other@example.com', 'nickname': 'other'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(EmailVerificationCode.objects.get(email=self.email).is_used)
+
+    def test_duplicate_nickname_keeps_code(self):
+        User.objects.create_user(email='taken@example.com', nickname=self.nickname, password=self.password)
+        data = {
+            'email': self.email,
+            'nickname': self.nickname,
+            'password': self.password,
+            'code': self.code
+        }
+        response = self.client.post(self.url, data)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(EmailVerificationCode.objects.get(email=self.email).is_used)
+
+    @patch('user_management.serializers.UserRegisterSerializer.validate_nickname', lambda self, value: value)
+    def test_concurrent_duplicate_is_conflict(self):
+        # 검증을 통과한 뒤 insert에서 unique 제약에 걸려도 500 대신 409, 코드는 사용되지 않음
+        User.objects.create_user(email='taken@example.com', nickname=self.nickname, password=self.password)
+        data = {
+            'email': self.email,
+            'nickname': self.nickname,
+            'password': self.password,
+            'code': self.code
+        }
+        response = self.client.post(self.url, data)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(EmailVerificationCode.objects.get(email=self.email).is_used)
+
     def test_invalid_code(self):
         data = {
             'email': self.email,
@@ -90,6 +175,7 @@ class UserRegisterTest(APITestCase):
         response = self.client.post(self.url, data)
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(User.objects.filter(email=self.email).exists())
 
 
 class UserLoginTest(APITestCase):
@@ -111,8 +197,8 @@ class UserLoginTest(APITestCase):
         response = self.client.post(url, data)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn('access', response.data)
-        self.assertIn('refresh', response.data)
+        self.assertIn('access', response.json())
+        self.assertIn('refresh', response.json())
 
     def test_login_invalid_credentials(self):
         # 잘못된 자격 증명으로 로그인 시도
@@ -124,7 +210,26 @@ class UserLoginTest(APITestCase):
         response = self.client.post(url, data)
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        self.assertIn('Invalid credentials', str(response.data))
+        self.assertIn('Invalid credentials', str(response.json()))
+
+    def test_login_with_json_body(self):
+        data = {'email': 'testuser@example.com', 'password': 'Testpass123!'}
+        response = self.client.post(reverse('login'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_outdated_hash_is_upgraded_on_login(self):
+        # 이전 반복 횟수로 저장된 해시는 로그인 성공 시 현재 설정으로 재해시
+        old_hash = PBKDF2PasswordHasher().encode('Testpass123!', 'saltsalt', iterations=1000)
+        User.objects.filter(id=self.user.id).update(password=old_hash)
+
+        data = {'email': 'testuser@example.com', 'password': 'Testpass123!'}
+        response = self.client.post(reverse('login'), data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.user.refresh_from_db()
+        self.assertNotEqual(self.user.password, old_hash)
+        self.assertIn(f"${settings.PASSWORD_PBKDF2_ITERATIONS}$", self.user.password)
+        self.assertTrue(self.user.check_password('Testpass123!'))
         
 
 class UserProfileViewTests(APITestCase):
@@ -163,4 +268,453 @@ class UserProfileViewTests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         expected_fields = {'email', 'nickname', 'avatar'}
-        self.assertEqual(set(response.data.keys()), expected_fields)
\ No newline at end of file
+        self.assertEqual(set(response.data.keys()), expected_fields)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ProfileCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        counter_patch = patch('user_management.services.incr_counter')
+        self.mock_incr_counter = counter_patch.start()
+        self.addCleanup(counter_patch.stop)
+        self.user = User.objects.create_user(
+            email='cached@example.com',
+            nickname='cached',
+            password='password123',
+        )
+        self.client = APIClient()
+
+        # JWT 토큰 생성 및 헤더 추가
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {str(refresh.access_token)}')
+
+    def test_cached_profile_skips_database(self):
+        url = reverse('user-profile', kwargs={'user_id': self.user.id})
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['nickname'], 'cached')
+        self.assertEqual(
+            [call.args[0] for call in self.mock_incr_counter.call_args_list],
+            [ProfileCacheService.MISSES_KEY, ProfileCacheService.HITS_KEY]
+        )
+
+    @patch('user_management.services.delete_keys')
+    @patch('user_management.services.get_counters')
+    def test_stats_command(self, mock_get_counters, mock_delete_keys):
+        mock_get_counters.return_value = {ProfileCacheService.HITS_KEY: 1, ProfileCacheService.MISSES_KEY: 1}
+        out = StringIO()
+        call_command('profile_cache_stats', '--reset', stdout=out)
+
+        self.assertIn("hits: 1, misses: 1, hit rate: 50.0%", out.getvalue())
+        mock_delete_keys.assert_called_once_with([ProfileCacheService.HITS_KEY, ProfileCacheService.MISSES_KEY])
+
+    def test_search_uses_nickname_key(self):
+        ProfileCacheService.set(self.user)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('search'), {'nickname': 'cached'})
+        self.assertEqual(response.data['id'], self.user.id)
+
+    def test_profile_update_refreshes_cache(self):
+        ProfileCacheService.set(self.user)
+        response = self.client.put(reverse('my-profile'), {'nickname': 'renamed'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(ProfileCacheService.get_by_id(self.user.id)['nickname'], 'renamed')
+        response = self.client.get(reverse('search'), {'nickname': 'cached'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_user_deletion_invalidates_cache(self):
+        ProfileCacheService.set(self.user)
+        user_id = self.user.id
+        self.user.delete()
+
+        response = self.client.get(reverse('user-profile', kwargs={'user_id': user_id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+
+class AvatarUploadTest(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(email='avatar@example.com', nickname='avatar', password='password123')
+        self.client = APIClient()
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {str(refresh.access_token)}')
+
+    def upload(self, content, name='avatar.jpg'):
+        return self.client.put(
+            reverse('my-profile'),
+            {'avatar': SimpleUploadedFile(name, content)},
+            format='multipart'
+        )
+
+    def make_jpeg(self):
+        buffer = BytesIO()
+        exif = Image.Exif()
+        exif[0x010F] = 'camera'
+        Image.new('RGB', (1200, 800), 'red').save(buffer, format='JPEG', exif=exif)
+        return buffer.getvalue()
+
+    def test_upload_is_resized_to_webp(self):
+        response = self.upload(self.make_jpeg())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.user.refresh_from_db()
+        self.assertTrue(response.data['avatar'].endswith(self.user.avatar.url))
+        for field, size in ((self.user.avatar, settings.AVATAR_SIZE), (self.user.avatar_thumbnail, settings.AVATAR_THUMBNAIL_SIZE)):
+            with default_storage.open(field.name) as file, Image.open(file) as image:
+                self.assertEqual(image.format, 'WEBP')
+                self.assertEqual(image.size, (size, size))
+                self.assertNotIn('exif', image.info)
+
+    def test_same_image_is_stored_once(self):
+        content = self.make_jpeg()
+        self.upload(content)
+        self.upload(content, name='copy.jpg')
+
+        self.user.refresh_from_db()
+        self.assertEqual(sorted(default_storage.listdir('avatars')[1]), sorted([
+            self.user.avatar.name.split('/')[-1],
+            self.user.avatar_thumbnail.name.split('/')[-1],
+        ]))
+
+    @override_settings(AVATAR_MAX_PIXELS=100 * 100)
+    @patch('PIL.ImageFile.ImageFile.load')
+    def test_oversized_image_is_rejected_before_decoding(self, mock_load):
+        buffer = BytesIO()
+        Image.new('1', (200, 200)).save(buffer, format='PNG')
+        response = self.upload(buffer.getvalue(), name='avatar.png')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_load.assert_not_called()
+
+    def test_invalid_image_is_rejected(self):
+        response = self.upload(b'not an image')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.avatar.name, 'avatars/default.png')
+
+
+class UpdateUserWinLossTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='player@example.com',
+            nickname='player',
+            password='password123',
+        )
+        self.opponent = User.objects.create_user(
+            email='opponent@example.com',
+            nickname='opponent',
+            password='password123',
+        )
+        self.client = APIClient()
+
+    def authenticate(self, user):
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {str(refresh.access_token)}')
+
+    def test_update_win_loss(self):
+        self.authenticate(self.user)
+        url = reverse('update-winloss', kwargs={'user_id': self.user.id})
+
+        # 잠금 없이 UPDATE 한 번으로 반영
+        with self.assertNumQueries(1):
+            response = self.client.put(url, {'is_win': True})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"wins": 1, "losses": 0})
+
+        response = self.client.put(url, {'is_win': False})
+        self.assertEqual(response.data, {"wins": 1, "losses": 1})
+
+    def test_update_other_user_denied(self):
+        self.authenticate(self.user)
+        url = reverse('update-winloss', kwargs={'user_id': self.opponent.id})
+        response = self.client.put(url, {'is_win': True})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(INTERNAL_API_TOKEN='secret')
+    def test_batch_update(self):
+        self.client.credentials(HTTP_X_INTERNAL_TOKEN='secret')
+        data = {"results": [
+            {"user_id": self.user.id, "is_win": True},
+            {"user_id": self.opponent.id, "is_win": False},
+            {"user_id": self.user.id, "is_win": True},
+        ]}
+        response = self.client.put(reverse('update-winloss-batch'), data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.opponent.refresh_from_db()
+        self.assertEqual((self.user.wins, self.user.losses), (2, 0))
+        self.assertEqual((self.opponent.wins, self.opponent.losses), (0, 1))
+
+    @override_settings(INTERNAL_API_TOKEN='secret')
+    def test_batch_update_rolls_back_on_unknown_user(self):
+        self.client.credentials(HTTP_X_INTERNAL_TOKEN='secret')
+        data = {"results": [
+            {"user_id": self.user.id, "is_win": True},
+            {"user_id": 9999, "is_win": False},
+        ]}
+        response = self.client.put(reverse('update-winloss-batch'), data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.wins, 0)
+
+    @override_settings(INTERNAL_API_TOKEN='secret')
+    def test_batch_update_requires_internal_token(self):
+        # 사용자 JWT로는 호출할 수 없음
+        self.authenticate(self.user)
+        data = {"results": [{"user_id": self.user.id, "is_win": True}]}
+        response = self.client.put(reverse('update-winloss-batch'), data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+@patch('friend.services.get_online_status', new_callable=AsyncMock, return_value={})
+@patch('user_management.consumers.PresenceService.schedule_announcement')
+@patch('user_management.consumers.remove_presence', new_callable=AsyncMock)
+@patch('user_management.consumers.refresh_presence', new_callable=AsyncMock, return_value=1)
+@patch('user_management.consumers.add_presence', new_callable=AsyncMock)
+class NotificationConsumerTest(APITestCase):
+    async def open(self, user_id):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), '/ws/user/notifications/')
+        communicator.scope['user_id'] = user_id
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        snapshot = await communicator.receive_json_from()
+        self.assertEqual(snapshot['type'], 'presence.snapshot')
+        return communicator
+
+    def test_each_connection_is_tracked(self, mock_add, mock_refresh, mock_remove, mock_schedule, mock_online):
+        mock_add.side_effect = [1, 2]
+        mock_remove.side_effect = [1, 0]
+
+        async def run():
+            first = await self.open(1)
+            second = await self.open(1)
+            await first.send_json_to({'type': 'heartbeat'})
+            await first.disconnect()
+            await second.disconnect()
+
+        async_to_sync(run)()
+        self.assertEqual(mock_add.await_count, 2)
+        channels = {call.args[1] for call in mock_add.await_args_list}
+        self.assertEqual(len(channels), 2)
+        mock_refresh.assert_awaited_once()
+        self.assertEqual({call.args[1] for call in mock_remove.await_args_list}, channels)
+        # 첫 연결과 마지막 연결 종료 때만 친구들에게 알림
+        self.assertEqual(mock_schedule.call_count, 2)
+
+    def test_notification_reaches_every_connection(self, mock_add, mock_refresh, mock_remove, mock_schedule, mock_online):
+        from channels.layers import get_channel_layer
+        mock_add.return_value = 1
+        mock_remove.return_value = 0
+
+        async def run():
+            connections = [await self.open(1), await self.open(1)]
+            await get_channel_layer().group_send('notification_1', {'type': 'friend.request', 'content': {'id': 1}})
+            messages = [await connection.receive_json_from() for connection in connections]
+            for connection in connections:
+                await connection.disconnect()
+            return messages
+
+        messages = async_to_sync(run)()
+        self.assertEqual([message['content'] for message in messages], [{'id': 1}, {'id': 1}])
+
+    def test_pre_encoded_event_is_sent_as_is(self, mock_add, mock_refresh, mock_remove, mock_schedule, mock_online):
+        from channels.layers import get_channel_layer
+        mock_add.return_value = 1
+        mock_remove.return_value = 0
+
+        async def run():
+            connection = await self.open(1)
+            channel_layer = get_channel_layer()
+            await channel_layer.group_send('notification_1', {'type': 'tournament_end', 'encoded': '{"cached":true}'})
+            cached = await connection.receive_from()
+            await channel_layer.group_send('notification_1', {'type': 'tournament_end', 'content': {'winner': 'me'}})
+            encoded = await connection.receive_json_from()
+            await connection.disconnect()
+            return cached, encoded
+
+        cached, encoded = async_to_sync(run)()
+        self.assertEqual(cached, '{"cached":true}')
+        self.assertEqual(encoded, {'type': 'tournament_end', 'content': {'winner': 'me'}})
+
+    def test_snapshot_lists_online_friends(self, mock_add, mock_refresh, mock_remove, mock_schedule, mock_online):
+        from friend.models import Friendship
+        user = User.objects.create_user(email='me@example.com', nickname='me', password='password123')
+        friends = [
+            User.objects.create_user(email=f'friend{i}@example.com', nickname=f'friend{i}', password='password123')
+            for i in range(2)
+        ]
+        for friend in friends:
+            Friendship.objects.create(user1=user, user2=friend)
+        mock_add.return_value = 1
+        mock_remove.return_value = 0
+        mock_online.return_value = {friends[0].id: True, friends[1].id: False}
+
+        async def run():
+            communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), '/ws/user/notifications/')
+            communicator.scope['user_id'] = user.id
+            await communicator.connect()
+            snapshot = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return snapshot
+
+        snapshot = async_to_sync(run)()
+        self.assertEqual(snapshot['content'], {'online_friends': [friends[0].id]})
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class ReapPresenceCommandTest(APITestCase):
+    @patch('user_management.management.commands.reap_presence.PresenceService.announce', new_callable=AsyncMock)
+    @patch('user_management.management.commands.reap_presence.delete_legacy_user_channels', new_callable=AsyncMock)
+    @patch('user_management.management.commands.reap_presence.reap_presence', new_callable=AsyncMock)
+    @patch('user_management.management.commands.reap_presence.scan_online_users', new_callable=AsyncMock)
+    def test_reaps_every_batch(self, mock_scan, mock_reap, mock_delete_legacy, mock_announce):
+        mock_scan.side_effect = [(7, ['1', '2']), (0, ['3'])]
+        mock_reap.side_effect = [([1], [('1', 'channel.a'), ('2', 'channel.b')]), ([], [])]
+        out = StringIO()
+        call_command('reap_presence', '--once', '--batch-size', '2', stdout=out)
+
+        self.assertEqual([call.args for call in mock_scan.await_args_list], [(0, 2), (7, 2)])
+        self.assertEqual([call.args[0] for call in mock_reap.await_args_list], [['1', '2'], ['3']])
+        mock_delete_legacy.assert_awaited_once()
+        mock_announce.assert_awaited_once_with(1, is_online=False)
+        self.assertIn("reaped 2 expired connections, 1 users went offline", out.getvalue())
+
+    @patch('user_management.management.commands.reap_presence.PresenceService.announce', new_callable=AsyncMock)
+    @patch('user_management.management.commands.reap_presence.delete_legacy_user_channels', new_callable=AsyncMock)
+    @patch('user_management.management.commands.reap_presence.reap_presence', new_callable=AsyncMock)
+    @patch('user_management.management.commands.reap_presence.scan_online_users', new_callable=AsyncMock)
+    def test_reports_offline_users_without_reaped_channels(self, mock_scan, mock_reap, mock_delete_legacy, mock_announce):
+        mock_scan.return_value = (0, ['1'])
+        mock_reap.return_value = ([1], [])
+        out = StringIO()
+        call_command('reap_presence', '--once', stdout=out)
+
+        self.assertIn("reaped 0 expired connections, 1 users went offline", out.getvalue())
+
+    @patch('user_management.redis_utils.TOUCH_PRESENCE_SCRIPT', new_callable=AsyncMock)
+    def test_presence_key_outlives_its_members(self, mock_touch):
+        # 워커가 죽어도 reaper가 만료된 연결을 볼 수 있도록 키는 PRESENCE_TTL보다 오래 유지
+        async_to_sync(add_presence)(1, 'channel.a')
+        user_id, channel_name, ttl, key_ttl = mock_touch.await_args.kwargs['args']
+        self.assertEqual(ttl, settings.PRESENCE_TTL)
+        self.assertGreaterEqual(key_ttl, settings.PRESENCE_TTL + settings.PRESENCE_REAPER_INTERVAL)
+
+
+class NotificationFanOutTest(APITestCase):
+    @patch('user_management.services.get_channel_layer')
+    @patch('user_management.services.get_presence_channels', new_callable=AsyncMock)
+    def test_fan_out_sends_once_to_every_connection(self, mock_presence_channels, mock_get_channel_layer):
+        # heartbeat가 늦은 연결(user 4)도 전송받지만 delivered에는 세지 않음
+        mock_presence_channels.return_value = {
+            1: (['specific.a!1', 'specific.a!2'], True),
+            2: ([], False),
+            3: (['specific.b!1'], True),
+            4: (['specific.c!1'], False),
+        }
+        channel_layer = mock_get_channel_layer.return_value
+        channel_layer.extensions = ['groups', 'flush', 'send_many']
+        channel_layer.send_many = AsyncMock()
+
+        event = {'type': 'tournament_end', 'content': {}}
+        result = async_to_sync(NotificationService.fan_out)([1, 2, 3, 4, 1], event)
+        self.assertEqual(result, {'delivered': 2, 'offline': 2})
+        mock_presence_channels.assert_awaited_once_with([1, 2, 3, 4])
+        channel_layer.send_many.assert_awaited_once_with(
+            ['specific.a!1', 'specific.a!2', 'specific.b!1', 'specific.c!1'],
+            {**event, 'encoded': '{"type":"tournament_end","content":{}}'}
+        )
+
+    @override_settings(INTERNAL_API_TOKEN='secret')
+    @patch('user_management.views.NotificationService.fan_out', new_callable=AsyncMock)
+    def test_fan_out_api(self, mock_fan_out):
+        mock_fan_out.return_value = {'delivered': 63, 'offline': 1}
+        url = reverse('notification-fan-out')
+        data = {'user_ids': list(range(1, 65)), 'type': 'tournament_round_start', 'content': {'round': 2}}
+
+        response = self.client.post(url, data, format='json', HTTP_X_INTERNAL_TOKEN='secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'delivered': 63, 'offline': 1})
+        mock_fan_out.assert_awaited_once_with(list(range(1, 65)), {'type': 'tournament_round_start', 'content': {'round': 2}})
+
+        response = self.client.post(url, {**data, 'type': 'friend_request'}, format='json', HTTP_X_INTERNAL_TOKEN='secret')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, 401)
+
+
+class QueuedEmailWorkerTest(APITestCase):
+    def test_worker_sends_queued_emails(self):
+        MailService.enqueue_email('a@example.com', 'subject', 'body a')
+        MailService.enqueue_email('b@example.com', 'subject', 'body b')
+        call_command('send_queued_emails', '--once', stdout=StringIO())
+
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['a@example.com', 'b@example.com'])
+        self.assertFalse(QueuedEmail.objects.exclude(status='sent').exists())
+
+    @patch('user_management.management.commands.send_queued_emails.get_connection')
+    def test_idle_worker_does_not_connect(self, mock_get_connection):
+        # 보낼 메일이 없으면 SMTP 연결을 열지 않음
+        call_command('send_queued_emails', '--once', stdout=StringIO())
+        mock_get_connection.return_value.open.assert_not_called()
+
+    @patch('user_management.services.send_mail', side_effect=ConnectionError("connection lost"))
+    def test_failed_email_is_retried_with_backoff(self, mock_send_mail):
+        queued = MailService.enqueue_email('a@example.com', 'subject', 'body')
+        delays = []
+        for attempt in range(3):
+            QueuedEmail.objects.filter(id=queued.id).update(next_attempt_at=timezone.now())
+            before = timezone.now()
+            call_command('send_queued_emails', '--once', stdout=StringIO())
+            queued.refresh_from_db()
+            delays.append(round((queued.next_attempt_at - before).total_seconds()))
+
+        self.assertEqual(queued.attempts, 3)
+        self.assertEqual(queued.status, 'pending')
+        self.assertEqual(delays, [10, 20, 40])
+
+
+class RedisVerificationCodeStoreTest(APITestCase):
+    @patch('user_management.services.MailService.enqueue_email')
+    @patch('user_management.services.store_verification_code')
+    def test_code_is_stored_with_ttl(self, mock_store, mock_enqueue):
+        AuthService.process_email_verification_code('user@example.com')
+        email, code, ttl = mock_store.call_args.args
+        self.assertEqual((email, ttl), ('user@example.com', 300))
+        self.assertIn(code, mock_enqueue.call_args.args[2])
+        self.assertFalse(EmailVerificationCode.objects.exists())
+
+    @patch('user_management.services.consume_verification_code', side_effect=[True, False])
+    def test_code_is_consumed_once(self, mock_consume):
+        AuthService.verify_email_code('user@example.com', 'ABC123')
+        with self.assertRaises(CustomValidationError):
+            AuthService.verify_email_code('user@example.com', 'ABC123')
+
+
+class PurgeVerificationCodesTest(APITestCase):
+    def test_purges_used_and_expired_codes(self):
+        EmailVerificationCode.objects.create(email='used@example.com', code='111111', is_used=True)
+        expired = EmailVerificationCode.objects.create(email='expired@example.com', code='222222')
+        EmailVerificationCode.objects.filter(id=expired.id).update(created_at=timezone.now() - timedelta(minutes=10))
+        active = EmailVerificationCode.objects.create(email='active@example.com', code='333333')
+
+        out = StringIO()
+        call_command('purge_verification_codes', '--batch-size', '1', '--sleep', '0', stdout=out)
+        self.assertEqual(list(EmailVerificationCode.objects.values_list('id', flat=True)), [active.id])
+        self.assertIn("deleted 2 verification codes in 2 batches", out.getvalue())
@@ -9,7 +9,9 @@ from .views import (
     VerifyCodeView,
     MyProfileView,
     SearchUserView,
-    UpdateUserWinLossView
+    UpdateUserWinLossView,
+    UpdateUserWinLossBatchView,
+    NotificationFanOutView
 )
 
 urlpatterns = [
@@ -23,4 +25,6 @@ urlpatterns = [
     path('2fa/', VerifyCodeView.as_view(), name='2fa'),
     path('search/', SearchUserView.as_view(), name='search'),
     path('<int:user_id>/win_loss/', UpdateUserWinLossView.as_view(), name='update-winloss'),
+    path('internal/win_loss/batch/', UpdateUserWinLossBatchView.as_view(), name='update-winloss-batch'),
+    path('internal/notifications/', NotificationFanOutView.as_view(), name='notification-fan-out'),
 ]
\ No newline at end of file
@@ -1,5 +1,10 @@
 from django.shortcuts import get_object_or_404
+from django.http import Http404
 from rest_framework.views import APIView
+from rest_framework.request import Request
+from rest_framework.parsers import JSONParser, FormParser, MultiPartParser
+from rest_framework.exceptions import ParseError
+from asgiref.sync import sync_to_async
 from .serializers import (
     EmailCheckAndSendCodeSerializer,
     NicknameCheckSerializer,
@@ -7,15 +12,24 @@ from .serializers import (
     UserLoginSerializer,
     UserProfileSerializer,
     VerifyCodeSerializer,
-    UserWinLossSerializer
+    UserWinLossSerializer,
+    UserWinLossBatchSerializer,
+    NotificationFanOutSerializer
     )
-from config.response_builder import response_ok, response_error, response_errors
+from config.response_builder import response_ok, response_error, response_errors, json_response_ok, json_response_errors
+from config.middleware import has_internal_token
+from config.schema import document_async_view
 from .models import User
+from .hashers import ahash_password
 from rest_framework import status
-from .services import MailService, AuthService
+from .services import MailService, AuthService, ProfileCacheService, UserService, NotificationService
 from config.custom_validation_error import CustomValidationError
 from rest_framework.response import Response
 from django.db import transaction
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+import json
 from config.error_type import ErrorType
 
 class NicknameCheckView(APIView):
@@ -35,34 +49,78 @@ class EmailCheckAndSendCodeView(APIView):
         return response_errors(errors=serializer.errors)
 
 
-class UserRegisterView(APIView):
-    def post(self, request):
-        serializer = UserRegisterSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save()
-            return response_ok(status=status.HTTP_201_CREATED)
-        return response_errors(errors=serializer.errors)
+# DRF 파서로 요청 본문을 읽음 (async 뷰는 APIView의 request.data를 쓸 수 없음)
+def parse_request_data(request):
+    parser_classes = [JSONParser, FormParser, MultiPartParser]
+    return Request(request, parsers=[parser() for parser in parser_classes]).data
 
 
-class UserLoginView(APIView):
-    def post(self, request):
-        serializer = UserLoginSerializer(data=request.data)
+# 비밀번호 해시를 기다리는 동안 스레드를 점유하지 않도록 async 뷰로 처리
+@document_async_view('register-complete', 'post', {
+    "operationId": "user_register_complete_create",
+    "summary": "Complete registration with the emailed verification code",
+    "tags": ["user"],
+    "responses": {
+        "201": {"description": "User created."},
+        "400": {"description": "Validation failed or the verification code is invalid."},
+    },
+})
+@method_decorator(csrf_exempt, name='dispatch')
+class UserRegisterView(View):
+    async def post(self, request):
+        try:
+            data = parse_request_data(request)
+        except ParseError:
+            return json_response_errors(errors=CustomValidationError(ErrorType.VALIDATION_ERROR))
+
+        serializer = UserRegisterSerializer(data=data)
+        if await sync_to_async(serializer.is_valid)():
+            encoded_password = await ahash_password(serializer.validated_data['password'])
+            try:
+                await sync_to_async(serializer.save)(encoded_password=encoded_password)
+            except CustomValidationError as e:
+                return json_response_errors(errors=e)
+            return json_response_ok(status=status.HTTP_201_CREATED)
+        return json_response_errors(errors=serializer.errors)
+
+
+# 비밀번호 검증을 기다리는 동안 스레드를 점유하지 않도록 async 뷰로 처리
+@document_async_view('login', 'post', {
+    "operationId": "user_login_create",
+    "summary": "Log in with email and password",
+    "tags": ["user"],
+    "responses": {
+        "200": {"description": "Access and refresh tokens."},
+        "202": {"description": "2FA required. A verification code was sent by email."},
+        "400": {"description": "Validation failed."},
+        "401": {"description": "Invalid credentials."},
+    },
+})
+@method_decorator(csrf_exempt, name='dispatch')
+class UserLoginView(View):
+    async def post(self, request):
+        try:
+            data = parse_request_data(request)
+        except ParseError:
+            return json_response_errors(errors=CustomValidationError(ErrorType.VALIDATION_ERROR))
+
+        serializer = UserLoginSerializer(data=data)
         if serializer.is_valid():
             email = serializer.validated_data['email']
             password = serializer.validated_data['password']
             try:
-                user = AuthService.authenticate_user(email, password)
+                user = await AuthService.authenticate_user(email, password)
             except CustomValidationError as e:
-                return response_errors(errors=e)
+                return json_response_errors(errors=e)
             if user.is_2fa_enabled:
-                AuthService.process_email_verification_code(email)
-                return response_ok({
+                await sync_to_async(AuthService.process_email_verification_code)(email)
+                return json_response_ok({
                     "message": "2FA_REQUIRED",
                     "email": email
                 }, status=status.HTTP_202_ACCEPTED)
-            data = AuthService.generate_token_with_user(user)
-            return response_ok(data)
-        return response_errors(errors=serializer.errors)
+            data = await sync_to_async(AuthService.generate_token_with_user)(user)
+            return json_response_ok(data)
+        return json_response_errors(errors=serializer.errors)
     
     
 class VerifyCodeView(APIView):
@@ -82,24 +140,33 @@ class VerifyCodeView(APIView):
 
 class MyProfileView(APIView):
     def get(self, request):
-        user = get_object_or_404(User, id=request.user_id)
-        serializer = UserProfileSerializer(user)
-        return response_ok(serializer.data)
+        try:
+            profile = ProfileCacheService.get_by_id(request.user_id)
+        except User.DoesNotExist:
+            raise Http404
+        return response_ok(profile)
 
     def put(self, request):
         user = get_object_or_404(User, id=request.user_id)
+        old_nickname = user.nickname
         serializer = UserProfileSerializer(user, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             serializer.save()
+            # 변경된 프로필로 캐시 갱신 (닉네임이 바뀌면 이전 닉네임 키 제거)
+            if old_nickname != user.nickname:
+                ProfileCacheService.invalidate(user.id, old_nickname)
+            ProfileCacheService.set(user)
             return response_ok(serializer.data)
         return response_errors(errors=serializer.errors) 
 
 
 class UserProfileView(APIView):
     def get(self, request, user_id):
-        user = get_object_or_404(User, id=user_id)
-        serializer = UserProfileSerializer(user)
-        return response_ok(serializer.data)
+        try:
+            profile = ProfileCacheService.get_by_id(user_id)
+        except User.DoesNotExist:
+            raise Http404
+        return response_ok(profile)
     
 
 class SendEmailView(APIView):
@@ -111,7 +178,7 @@ class SendEmailView(APIView):
         email = request.data.get('email')
         subject = request.data.get('subject')
         message = request.data.get('message')
-        MailService.custom_send_email(email, subject, message)
+        MailService.enqueue_email(email, subject, message)
         return response_ok()
         
         
@@ -122,31 +189,71 @@ class SearchUserView(APIView):
             return Response({"message":"nickname param required."}, status.HTTP_400_BAD_REQUEST)
         
         try:
-            user = User.objects.get(nickname=nickname)
+            data = ProfileCacheService.get_by_nickname(nickname)
         except User.DoesNotExist:
             return Response({"messsage":"user not found."}, status.HTTP_404_NOT_FOUND)
         
-        data = UserProfileSerializer(user).data
         return response_ok(data)
 
 
 class UpdateUserWinLossView(APIView):
-    @transaction.atomic
     def put(self, request, user_id):
         if user_id != request.user_id:
-            return response_error(ErrorType.PERMISSION_DENIED)
+            return response_errors(errors=CustomValidationError(ErrorType.PERMISSION_DENIED))
+
+        serializer = UserWinLossSerializer(data=request.data)
+        if not serializer.is_valid():
+            return response_errors(serializer.errors)
 
         try:
-            user = User.objects.select_for_update().get(id=user_id)
-        except User.DoesNotExist:
-            return response_error(ErrorType.USER_NOT_FOUND)
-            
-        serializer = UserWinLossSerializer(instance=user, data=request.data)
+            record = UserService.record_match_result(user_id, serializer.validated_data['is_win'])
+        except CustomValidationError as e:
+            return response_errors(errors=e)
+        return response_ok(record)
+
+
+# 토너먼트 결과를 한 트랜잭션으로 일괄 반영 (관리자 계정 전용)
+# 토너먼트 서비스가 경기 결과를 한 번에 반영하는 내부 API (JWT 대신 X-Internal-Token)
+class UpdateUserWinLossBatchView(APIView):
+    def put(self, request):
+        if not has_internal_token(request):
+            return response_errors(errors=CustomValidationError(ErrorType.INVALID_INTERNAL_TOKEN))
+
+        serializer = UserWinLossBatchSerializer(data=request.data)
         if not serializer.is_valid():
             return response_errors(serializer.errors)
 
-        serializer.save()
+        results = [(result['user_id'], result['is_win']) for result in serializer.validated_data['results']]
+        try:
+            with transaction.atomic():
+                records = UserService.record_match_results(results)
+        except CustomValidationError as e:
+            return response_errors(errors=e)
         return response_ok({
-            "wins": user.wins,
-            "losses": user.losses
-        })
\ No newline at end of file
+            "results": [{"user_id": user_id, **record} for user_id, record in records.items()]
+        })
+
+
+# 토너먼트 서비스 등이 여러 사용자에게 같은 알림을 보낼 때 사용하는 내부 API
+@method_decorator(csrf_exempt, name='dispatch')
+class NotificationFanOutView(View):
+    async def post(self, request):
+        if not has_internal_token(request):
+            return json_response_errors(errors=CustomValidationError(ErrorType.INVALID_INTERNAL_TOKEN))
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return json_response_errors(errors=CustomValidationError(ErrorType.VALIDATION_ERROR))
+
+        serializer = NotificationFanOutSerializer(data=data)
+        if not serializer.is_valid():
+            return json_response_errors(serializer.errors)
+
+        result = await NotificationService.fan_out(
+            serializer.validated_data['user_ids'],
+            {
+                "type": serializer.validated_data['type'],
+                "content": serializer.validated_data['content']
+            }
+        )
+        return json_response_ok(result)
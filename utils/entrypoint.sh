@@ -10,6 +10,26 @@ done
 
 echo "PostgreSQL is up and running!"
 
+# 관리 커맨드 워커를 백그라운드에서 실행하고, 종료되면 5초 뒤 다시 시작
+start_worker() {
+    (
+        while true; do
+            python manage.py "$@" || echo "Worker $1 exited with status $?"
+            sleep 5
+        done
+    ) &
+}
+
+# 워커를 별도 컨테이너로 실행하는 경우 START_WORKERS=false
+if [ "${START_WORKERS:-true}" = "true" ]; then
+    # 인증 코드/2FA 메일은 큐에 저장되고 이 워커만 전송함
+    start_worker send_queued_emails
+    # 친구 수락/삭제 시 채팅방 생성·삭제 요청을 채팅 서비스로 전달
+    start_worker process_chat_outbox
+    # 비정상 종료된 워커가 남긴 접속 정보를 정리
+    start_worker reap_presence
+fi
+
 exec "$@"
 
 echo "Command: $@"
\ No newline at end of file